@@ -1,19 +1,47 @@
+import asyncio
+import random
 from duckduckgo_search import DDGS
-import json
-
-def test_search():
-    ddgs = DDGS()
-    query = "Animal Behavior animal alertness"
-    print(f"Searching for videos: {query}")
-    
-    try:
-        results = list(ddgs.videos(query, max_results=1))
+
+# A small batch of queries to exercise concurrent prefetching
+QUERIES = [
+    "Animal Behavior animal alertness",
+    "Animal Behavior animal communication",
+    "Animal Behavior animal migration",
+]
+
+MAX_CONCURRENT_SEARCHES = 3
+
+
+def _blocking_search(query: str, max_results: int = 1):
+    with DDGS() as ddgs:
+        return list(ddgs.videos(query, max_results=max_results))
+
+
+async def search_videos(query: str, sem: asyncio.Semaphore):
+    """Run the blocking DDGS call off the event loop, rate-limited by sem."""
+    async with sem:
+        print(f"Searching for videos: {query}")
+        try:
+            results = await asyncio.to_thread(_blocking_search, query)
+        except Exception as e:
+            print(f"Error for '{query}': {e}")
+            return []
+        # Keep a polite delay between searches
+        await asyncio.sleep(random.uniform(1, 3))
+        return results
+
+
+async def test_search():
+    sem = asyncio.Semaphore(MAX_CONCURRENT_SEARCHES)
+    tasks = [search_videos(q, sem) for q in QUERIES]
+    batches = await asyncio.gather(*tasks)
+
+    for query, results in zip(QUERIES, batches):
         if results:
+            print(f"--- {query} ---")
             print("Keys in result:", results[0].keys())
             print("First result:", results[0])
-            
-    except Exception as e:
-        print(f"Error: {e}")
+
 
 if __name__ == "__main__":
-    test_search()
+    asyncio.run(test_search())
@@ -2,6 +2,7 @@ import argparse
 import sys
 from pathlib import Path
 from video_scraper import VideoScraperOrchestrator
+from video_scraper.config import ensure_dirs
 from video_scraper.utils import logger
 
 
@@ -76,6 +77,8 @@ def main():
         logger.error(f"JSON file not found: {json_path}")
         sys.exit(1)
 
+    ensure_dirs()
+
     try:
         orchestrator = VideoScraperOrchestrator(json_path)
 
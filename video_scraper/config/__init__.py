@@ -7,10 +7,12 @@ from .settings import (
     STORAGE_DIR,
     METADATA_DIR,
     LOGS_DIR,
+    ensure_dirs,
     MAX_VIDEO_DURATION_SECONDS,
     VIDEO_WIDTH,
     VIDEO_HEIGHT,
     MAX_CONCURRENT_DOWNLOADS,
+    CONNECTION_POOL_SIZE,
     DOWNLOAD_DELAY_MIN,
     DOWNLOAD_DELAY_MAX,
     SEARCH_DELAY_MIN,
@@ -19,6 +21,7 @@ from .settings import (
     SEARCH_FETCH_LIMIT,
     LOG_LEVEL,
     USER_AGENTS,
+    get_random_user_agent,
     BACKOFF_BASE_DELAY,
     BACKOFF_MAX_DELAY,
     BACKOFF_FACTOR,
@@ -33,10 +36,12 @@ __all__ = [
     "STORAGE_DIR",
     "METADATA_DIR",
     "LOGS_DIR",
+    "ensure_dirs",
     "MAX_VIDEO_DURATION_SECONDS",
     "VIDEO_WIDTH",
     "VIDEO_HEIGHT",
     "MAX_CONCURRENT_DOWNLOADS",
+    "CONNECTION_POOL_SIZE",
     "DOWNLOAD_DELAY_MIN",
     "DOWNLOAD_DELAY_MAX",
     "SEARCH_DELAY_MIN",
@@ -45,6 +50,7 @@ __all__ = [
     "SEARCH_FETCH_LIMIT",
     "LOG_LEVEL",
     "USER_AGENTS",
+    "get_random_user_agent",
     "BACKOFF_BASE_DELAY",
     "BACKOFF_MAX_DELAY",
     "BACKOFF_FACTOR",
@@ -1,10 +1,21 @@
 import os
 import random
+from functools import lru_cache
 from pathlib import Path
 from dotenv import load_dotenv
 
 load_dotenv()
 
+
+@lru_cache(maxsize=None)
+def _get_int_env(name: str, default: str) -> int:
+    return int(os.getenv(name, default))
+
+
+@lru_cache(maxsize=None)
+def _get_float_env(name: str, default: str) -> float:
+    return float(os.getenv(name, default))
+
 # --- Directory Structure ---
 # Adjust this path logic if your config is deep inside folders
 # Given your error: C:\Users\Albus\Documents\GitHub\vg_video_script_scraper\video_scraper\config\__init__.py
@@ -19,38 +30,47 @@ STORAGE_DIR = DATA_DIR / "storage"
 METADATA_DIR = DATA_DIR / "metadata"
 LOGS_DIR = BASE_DIR / "video_scraper" / "logs"
 
-# Ensure all directories exist
-for directory in [DATA_DIR, TEMP_DIR, PROCESSED_DIR, STATE_DIR, LOGS_DIR, STORAGE_DIR, METADATA_DIR]:
-    directory.mkdir(parents=True, exist_ok=True)
+def ensure_dirs():
+    """Create the data directories. Called lazily so importing settings
+    (CLI --help, test collection) doesn't pay 7 stat/mkdir syscalls."""
+    for directory in (DATA_DIR, TEMP_DIR, PROCESSED_DIR, STATE_DIR, LOGS_DIR, STORAGE_DIR, METADATA_DIR):
+        directory.mkdir(parents=True, exist_ok=True)
 
 # --- Video Settings ---
-MAX_VIDEO_DURATION_SECONDS = int(os.getenv("MAX_VIDEO_DURATION_SECONDS", "900"))
-VIDEO_WIDTH = int(os.getenv("VIDEO_WIDTH", "256"))
-VIDEO_HEIGHT = int(os.getenv("VIDEO_HEIGHT", "256"))
+MAX_VIDEO_DURATION_SECONDS = _get_int_env("MAX_VIDEO_DURATION_SECONDS", "900")
+VIDEO_WIDTH = _get_int_env("VIDEO_WIDTH", "256")
+VIDEO_HEIGHT = _get_int_env("VIDEO_HEIGHT", "256")
 VIDEO_QUALITY = os.getenv("VIDEO_QUALITY", "360") 
 
 # --- Speed & Concurrency (The Missing Part) ---
 # This is the variable causing your error:
-MAX_CONCURRENT_DOWNLOADS = int(os.getenv("MAX_CONCURRENT_DOWNLOADS", "3"))
+MAX_CONCURRENT_DOWNLOADS = _get_int_env("MAX_CONCURRENT_DOWNLOADS", "3")
+CONNECTION_POOL_SIZE = _get_int_env("CONNECTION_POOL_SIZE", str(MAX_CONCURRENT_DOWNLOADS * 2))
 
-DOWNLOAD_DELAY_MIN = float(os.getenv("DOWNLOAD_DELAY_MIN", "2"))
-DOWNLOAD_DELAY_MAX = float(os.getenv("DOWNLOAD_DELAY_MAX", "5"))
+DOWNLOAD_DELAY_MIN = _get_float_env("DOWNLOAD_DELAY_MIN", "2")
+DOWNLOAD_DELAY_MAX = _get_float_env("DOWNLOAD_DELAY_MAX", "5")
 
-SEARCH_DELAY_MIN = float(os.getenv("SEARCH_DELAY_MIN", "1"))
-SEARCH_DELAY_MAX = float(os.getenv("SEARCH_DELAY_MAX", "3"))
-SEARCH_FETCH_LIMIT = int(os.getenv("SEARCH_FETCH_LIMIT", "50"))
+SEARCH_DELAY_MIN = _get_float_env("SEARCH_DELAY_MIN", "1")
+SEARCH_DELAY_MAX = _get_float_env("SEARCH_DELAY_MAX", "3")
+SEARCH_FETCH_LIMIT = _get_int_env("SEARCH_FETCH_LIMIT", "50")
 
 # --- Retry Logic ---
-MAX_RETRIES = int(os.getenv("MAX_RETRIES", "5"))
+MAX_RETRIES = _get_int_env("MAX_RETRIES", "5")
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
-BACKOFF_BASE_DELAY = float(os.getenv("BACKOFF_BASE_DELAY", "10")) 
-BACKOFF_MAX_DELAY = float(os.getenv("BACKOFF_MAX_DELAY", "600"))
-BACKOFF_FACTOR = float(os.getenv("BACKOFF_FACTOR", "2"))
+BACKOFF_BASE_DELAY = _get_float_env("BACKOFF_BASE_DELAY", "10") 
+BACKOFF_MAX_DELAY = _get_float_env("BACKOFF_MAX_DELAY", "600")
+BACKOFF_FACTOR = _get_float_env("BACKOFF_FACTOR", "2")
 
 # --- User Agents ---
-USER_AGENTS = [
+USER_AGENTS = (
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36",
     "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
     "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36",
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:122.0) Gecko/20100101 Firefox/122.0",
-]
\ No newline at end of file
+)
+
+_ua_choice = random.choice
+
+
+def get_random_user_agent() -> str:
+    return _ua_choice(USER_AGENTS)
\ No newline at end of file
@@ -1,11 +1,39 @@
-import json
+import atexit
+import logging
+import mmap
+import re
+import orjson
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 from pathlib import Path
 from typing import Optional, List, Dict, Any, Set
-from video_scraper.config import STORAGE_DIR, METADATA_DIR
+from urllib.parse import parse_qs, urlparse
+from video_scraper.config import STORAGE_DIR, METADATA_DIR, STATE_DIR, ensure_dirs
 from video_scraper.utils import logger
+from video_scraper.utils.checkpoint import save_checkpoint, load_checkpoint
+
+# Flush the append handles every N records for crash safety
+FLUSH_EVERY = 50
+
+# Bound on the serialized-metadata LRU cache (entries, not bytes)
+META_CACHE_SIZE = 256
+
+# Pulls video_url values straight out of raw JSONL bytes without paying for
+# a full JSON parse per line.
+_URL_FIELD_RE = re.compile(rb'"video_url"\s*:\s*"([^"\\]+)"')
+
+# Strips everything but [A-Za-z0-9_-] in C instead of a per-char Python loop
+_SAFE_NAME_RE = re.compile(r"[^A-Za-z0-9_-]")
+
+
+def _now() -> str:
+    return datetime.now().isoformat(timespec="seconds")
+
 
 class LocalStorageManager:
     def __init__(self):
+        ensure_dirs()
         self.storage_dir = STORAGE_DIR
         self.metadata_dir = METADATA_DIR
         
@@ -15,55 +43,254 @@ class LocalStorageManager:
         self.failed_file = self.storage_dir / "failed.jsonl"
         self.search_logs_file = self.storage_dir / "search_logs.jsonl"
 
+        # Plain-text sidecar with one URL per line: loading a line-oriented
+        # file is far cheaper than JSON-parsing every JSONL record.
+        self.urls_idx_file = self.storage_dir / "urls.idx"
+
+        # Byte offset into harvested.jsonl below which every record is known
+        # to be completed, so pending scans resume instead of rescanning.
+        self.harvested_cursor_file = STATE_DIR / "harvested.cursor"
+        self._harvested_pos = self._load_harvested_pos()
+
+        # A crash mid-append can leave a truncated last line that breaks
+        # JSONL parsing on resume; trim it before anything reads the files.
+        for file_path in (
+            self.harvested_file,
+            self.processed_file,
+            self.failed_file,
+            self.search_logs_file,
+        ):
+            self._trim_partial_tail(file_path)
+
+        # In-memory caches so lookups are O(1) hash probes instead of
+        # re-reading and JSON-parsing the files on every call.
+        self._url_cache: Set[str] = set()
+        self._completed_cache: Set[str] = set()
+        self._search_log_set: Set[tuple] = set()
+        self._load_url_cache()
+        self._load_search_log_set()
+
+        # Long-lived append handles: one write() per record instead of an
+        # open/write/close cycle for every single line.
+        self._append_handles = {
+            file_path: open(file_path, "a", encoding="utf-8", buffering=1 << 16)
+            for file_path in (
+                self.harvested_file,
+                self.processed_file,
+                self.failed_file,
+                self.search_logs_file,
+                self.urls_idx_file,
+            )
+        }
+        # Per-handle write counts so one busy file can't reset the flush
+        # accounting of the others
+        self._writes_since_flush = {fp: 0 for fp in self._append_handles}
+
+        # LRU of video_id -> serialized metadata, so retried videos don't
+        # pay for re-encoding the same multi-KB info_dict.
+        self._meta_bytes_cache: "OrderedDict[str, bytes]" = OrderedDict()
+
+        # Metadata shard directories already created this run
+        self._shards_created: Set[str] = set()
+        atexit.register(self.close)
+
+    def _load_url_cache(self):
+        """Populate the URL caches once at startup."""
+        self._url_cache = self.get_existing_urls()
+        with ThreadPoolExecutor(max_workers=2) as ex:
+            self._completed_cache = set().union(
+                *ex.map(self._scan_urls_from_file, (self.processed_file, self.failed_file))
+            )
+
+    def _scan_urls_from_file(self, file_path: Path) -> Set[str]:
+        """Extract video_url values from a JSONL file via mmap + regex."""
+        urls: Set[str] = set()
+        if not file_path.exists() or file_path.stat().st_size == 0:
+            return urls
+        try:
+            with open(file_path, "rb") as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    for match in _URL_FIELD_RE.findall(mm):
+                        urls.add(match.decode("utf-8"))
+        except Exception as e:
+            logger.error("Error scanning %s: %s", file_path, e)
+        return urls
+
+    @staticmethod
+    def _trim_partial_tail(file_path: Path):
+        """Truncate a trailing partial line left behind by a crash mid-append."""
+        try:
+            if not file_path.exists() or file_path.stat().st_size == 0:
+                return
+            with open(file_path, "rb+") as f:
+                size = f.seek(0, 2)
+                f.seek(size - 1)
+                if f.read(1) == b"\n":
+                    return
+                pos = size
+                while pos > 0:
+                    read_size = min(64 * 1024, pos)
+                    pos -= read_size
+                    f.seek(pos)
+                    block = f.read(read_size)
+                    idx = block.rfind(b"\n")
+                    if idx != -1:
+                        f.truncate(pos + idx + 1)
+                        logger.warning("Trimmed partial tail from %s", file_path)
+                        return
+                f.truncate(0)
+                logger.warning("Trimmed partial tail from %s", file_path)
+        except Exception as e:
+            logger.error("Error trimming %s: %s", file_path, e)
+
+    def _load_harvested_pos(self) -> int:
+        try:
+            state = load_checkpoint(self.harvested_cursor_file)
+            if state:
+                pos = int(state.get("harvested_pos", 0))
+                # Guard against a truncated/rotated harvested file
+                if self.harvested_file.exists() and pos <= self.harvested_file.stat().st_size:
+                    return pos
+        except Exception as e:
+            logger.error("Error loading harvested cursor: %s", e)
+        return 0
+
+    def _save_harvested_pos(self, pos: int):
+        if save_checkpoint(self.harvested_cursor_file, {"harvested_pos": pos, "ts": _now()}):
+            self._harvested_pos = pos
+
+    def _load_search_log_set(self):
+        """Stream search_logs.jsonl once so existence checks are hash probes."""
+        self._search_log_loaded = True
+        if not self.search_logs_file.exists():
+            return
+        try:
+            # Binary mode with a large buffer: orjson parses bytes directly,
+            # so UTF-8 decoding the lines first is wasted work.
+            with open(self.search_logs_file, "rb", buffering=1 << 19) as f:
+                for line in f:
+                    if not line.strip(): continue
+                    try:
+                        data = orjson.loads(line)
+                        self._search_log_set.add((data.get("topic"), data.get("subtopic")))
+                    except orjson.JSONDecodeError:
+                        pass
+        except Exception as e:
+            self._search_log_loaded = False
+            logger.error("Error reading %s: %s", self.search_logs_file, e)
+
+    @staticmethod
+    def _read_lines_backwards(file_path: Path, block_size: int = 64 * 1024):
+        """Yield lines of a file from EOF backwards, reading in blocks."""
+        with open(file_path, "rb") as f:
+            f.seek(0, 2)
+            pos = f.tell()
+            tail = b""
+            while pos > 0:
+                read_size = min(block_size, pos)
+                pos -= read_size
+                f.seek(pos)
+                block = f.read(read_size) + tail
+                lines = block.split(b"\n")
+                # First piece may be a partial line; keep it for the next block
+                tail = lines[0]
+                for line in reversed(lines[1:]):
+                    if line.strip():
+                        yield line
+            if tail.strip():
+                yield tail
+
+    def _count_write(self, file_path: Path, n: int = 1):
+        """Track writes per handle and flush it every FLUSH_EVERY records."""
+        count = self._writes_since_flush[file_path] + n
+        if count >= FLUSH_EVERY:
+            self._append_handles[file_path].flush()
+            count = 0
+        self._writes_since_flush[file_path] = count
+
     def _append_jsonl(self, file_path: Path, data: Dict[str, Any]):
         try:
-            with open(file_path, "a", encoding="utf-8") as f:
-                f.write(json.dumps(data) + "\n")
+            fh = self._append_handles[file_path]
+            fh.write(orjson.dumps(data).decode() + "\n")
+            self._count_write(file_path)
         except Exception as e:
-            logger.error(f"Error appending to {file_path}: {e}")
+            logger.error("Error appending to %s: %s", file_path, e)
+
+    def close(self):
+        """Flush and close the append handles."""
+        for fh in self._append_handles.values():
+            try:
+                if not fh.closed:
+                    fh.flush()
+                    fh.close()
+            except Exception as e:
+                logger.error("Error closing storage handle: %s", e)
 
     def video_exists(self, video_url: str) -> bool:
-        """
-        Check if video exists in harvested or processed lists.
-        Ideally we cache this in memory for performance.
-        """
-        # For efficiency, this should probably rely on a cached set
-        # But for "strict writing", we check files. 
-        # To avoid reading files every time, we should use a cache.
-        return video_url in self.get_existing_urls()
+        """Check if video exists in harvested, processed or failed lists."""
+        return video_url in self._url_cache
 
     def get_existing_urls(self) -> Set[str]:
-        urls = set()
-        for file_path in [self.harvested_file, self.processed_file, self.failed_file]:
-            if file_path.exists():
-                try:
-                    with open(file_path, "r", encoding="utf-8") as f:
-                        for line in f:
-                            if not line.strip(): continue
-                            try:
-                                data = json.loads(line)
-                                if "video_url" in data:
-                                    urls.add(data["video_url"])
-                            except json.JSONDecodeError:
-                                pass
-                except Exception as e:
-                    logger.error(f"Error reading {file_path}: {e}")
+        handles = getattr(self, "_append_handles", None)
+        if handles:
+            try:
+                handles[self.urls_idx_file].flush()
+            except Exception:
+                pass
+        if self.urls_idx_file.exists():
+            try:
+                return set(self.urls_idx_file.read_text(encoding="utf-8").splitlines())
+            except Exception as e:
+                logger.error("Error reading %s: %s", self.urls_idx_file, e)
+        return self.rebuild_index()
+
+    def _append_url_index(self, video_url: str):
+        try:
+            self._append_handles[self.urls_idx_file].write(video_url + "\n")
+            self._count_write(self.urls_idx_file)
+        except Exception as e:
+            logger.error("Error appending to %s: %s", self.urls_idx_file, e)
+
+    def rebuild_index(self) -> Set[str]:
+        """Rebuild urls.idx from the JSONL files with a single parallel scan."""
+        files = [self.harvested_file, self.processed_file, self.failed_file]
+        with ThreadPoolExecutor(max_workers=3) as ex:
+            urls = set().union(*ex.map(self._scan_urls_from_file, files))
+        try:
+            with open(self.urls_idx_file, "w", encoding="utf-8") as f:
+                f.writelines(url + "\n" for url in urls)
+        except Exception as e:
+            logger.error("Error writing %s: %s", self.urls_idx_file, e)
         return urls
 
     def batch_insert_videos(self, videos_data: List[Dict[str, Any]]) -> int:
-        count = 0
-        existing = self.get_existing_urls()
-        
+        lines = []
+        url_lines = []
         for vid in videos_data:
-            if vid["video_url"] not in existing:
-                self._append_jsonl(self.harvested_file, vid)
-                existing.add(vid["video_url"])
-                count += 1
-        return count
+            url = vid["video_url"]
+            if url in self._url_cache:
+                continue
+            self._url_cache.add(url)
+            lines.append(orjson.dumps(vid).decode() + "\n")
+            url_lines.append(url + "\n")
+        if not lines:
+            return 0
+        try:
+            # One write() for the whole batch instead of one per record
+            self._append_handles[self.harvested_file].write("".join(lines))
+            self._append_handles[self.urls_idx_file].write("".join(url_lines))
+            self._count_write(self.harvested_file, len(lines))
+            self._count_write(self.urls_idx_file, len(url_lines))
+        except Exception as e:
+            logger.error("Error batch appending to %s: %s", self.harvested_file, e)
+        return len(lines)
 
     def insert_video(self, video_url: str, **kwargs) -> bool:
         data = {"video_url": video_url, **kwargs}
         self._append_jsonl(self.harvested_file, data)
+        if video_url not in self._url_cache:
+            self._append_url_index(video_url)
+        self._url_cache.add(video_url)
         return True
 
     def update_video_details(
@@ -75,7 +302,8 @@ class LocalStorageManager:
         channel: Optional[str] = None,
         upload_date: Optional[str] = None,
         status: str = "processed",
-        full_info: Optional[Dict[str, Any]] = None
+        full_info: Optional[Dict[str, Any]] = None,
+        force: bool = False
     ) -> bool:
         try:
             # 1. Append to processed.jsonl (log of completions)
@@ -87,34 +315,118 @@ class LocalStorageManager:
                 "channel": channel,
                 "upload_date": upload_date,
                 "status": status,
-                "timestamp": str(datetime.now())
+                "timestamp": _now()
             }
             self._append_jsonl(self.processed_file, record)
+            if video_url not in self._url_cache:
+                self._append_url_index(video_url)
+            self._url_cache.add(video_url)
+            self._completed_cache.add(video_url)
 
             # 2. Save full metadata to individual file
             if full_info:
-                # Use video ID if available, else sanitized URL
-                video_id = full_info.get("id") or video_url.split("v=")[-1]
-                safe_name = "".join(x for x in video_id if x.isalnum() or x in "-_")
-                meta_path = self.metadata_dir / f"{safe_name}.json"
-                
-                with open(meta_path, "w", encoding="utf-8") as f:
-                    json.dump(full_info, f, indent=2, ensure_ascii=False)
-                
-            logger.info(f"Saved local records for: {video_url}")
+                self._save_metadata(video_url, full_info, force)
+
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("Saved local records for: %s", video_url)
             return True
         except Exception as e:
-            logger.error(f"Error updating video details: {e}")
+            logger.error("Error updating video details: %s", e)
             return False
 
+    def _save_metadata(self, video_url: str, full_info: Dict[str, Any], force: bool = False):
+        # Use video ID if available, else the URL's v= query parameter
+        video_id = full_info.get("id") or parse_qs(urlparse(video_url).query).get("v", [video_url])[0]
+        safe_name = _SAFE_NAME_RE.sub("", video_id)
+        # Shard by ID prefix so the metadata dir never accumulates
+        # tens of thousands of entries in one flat directory.
+        shard = safe_name[:2] or "_"
+        meta_dir = self.metadata_dir / shard
+        if shard not in self._shards_created:
+            meta_dir.mkdir(exist_ok=True)
+            self._shards_created.add(shard)
+        meta_path = meta_dir / f"{safe_name}.json"
+
+        if meta_path.exists() and not force:
+            # Retry/resume of an already-processed video: the yt-dlp
+            # info_dict can be megabytes, so don't re-serialize it.
+            logger.debug("Metadata already saved, skipping dump: %s", meta_path)
+            return
+
+        blob = self._meta_bytes_cache.get(safe_name)
+        if blob is None:
+            blob = orjson.dumps(full_info, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+            self._meta_bytes_cache[safe_name] = blob
+            if len(self._meta_bytes_cache) > META_CACHE_SIZE:
+                self._meta_bytes_cache.popitem(last=False)
+        else:
+            self._meta_bytes_cache.move_to_end(safe_name)
+        # Cheap idempotence check to skip the disk write entirely
+        if not (meta_path.exists() and meta_path.stat().st_size == len(blob)):
+            meta_path.write_bytes(blob)
+
+    def batch_update_video_details(self, records: List[Dict[str, Any]]) -> int:
+        """Flush a batch of completion records in one buffered pass.
+
+        Each record carries the update_video_details keyword arguments.
+        The processed-log lines for the whole batch are joined into a
+        single write() so the flush cost is paid once, not per video.
+        A failed log write rolls back the batch's completed markers and
+        re-raises so the caller can retry the records.
+        """
+        if not records:
+            return 0
+        ts = _now()
+        lines = []
+        for rec in records:
+            video_url = rec["video_url"]
+            lines.append(orjson.dumps({
+                "video_url": video_url,
+                "local_path": rec.get("local_path"),
+                "duration": rec.get("duration"),
+                "title": rec.get("title"),
+                "channel": rec.get("channel"),
+                "upload_date": rec.get("upload_date"),
+                "status": rec.get("status", "processed"),
+                "timestamp": ts,
+            }).decode() + "\n")
+            if video_url not in self._url_cache:
+                self._append_url_index(video_url)
+            self._url_cache.add(video_url)
+            self._completed_cache.add(video_url)
+            full_info = rec.get("full_info")
+            if full_info:
+                try:
+                    self._save_metadata(video_url, full_info, rec.get("force", False))
+                except Exception as e:
+                    logger.error("Error saving metadata for %s: %s", video_url, e)
+        try:
+            fh = self._append_handles[self.processed_file]
+            fh.write("".join(lines))
+            fh.flush()
+        except Exception as e:
+            logger.error("Error batch appending to %s: %s", self.processed_file, e)
+            # Roll back the completed markers so the batch's videos still
+            # look unfinished, and surface the failure to the caller —
+            # silently dropping the batch would leave them marked done in
+            # state while absent from the processed log.
+            for rec in records:
+                self._completed_cache.discard(rec["video_url"])
+            raise
+        return len(records)
+
     def mark_video_failed(self, video_url: str, error_msg: str) -> bool:
         data = {
             "video_url": video_url,
             "status": "failed",
             "error": error_msg,
-            "timestamp": str(datetime.now())
+            "timestamp": _now()
         }
         self._append_jsonl(self.failed_file, data)
+        if video_url not in self._url_cache:
+            self._append_url_index(video_url)
+        self._url_cache.add(video_url)
+        self._completed_cache.add(video_url)
         return True
 
     def insert_search_log(self, topic: str, subtopic: str, result_count: int):
@@ -122,68 +434,117 @@ class LocalStorageManager:
             "topic": topic,
             "subtopic": subtopic,
             "result_count": result_count,
-            "timestamp": str(datetime.now())
+            "timestamp": _now()
         }
         self._append_jsonl(self.search_logs_file, data)
+        self._search_log_set.add((topic, subtopic))
+
+    def batch_insert_videos_and_logs(
+        self,
+        videos_data: List[Dict[str, Any]],
+        search_logs: List[tuple],
+    ) -> int:
+        """Insert harvested rows and their search logs in one buffered pass.
+
+        search_logs is a list of (topic, subtopic, result_count) tuples.
+        """
+        count = self.batch_insert_videos(videos_data)
+        if search_logs:
+            ts = _now()
+            lines = []
+            for topic, subtopic, result_count in search_logs:
+                lines.append(orjson.dumps({
+                    "topic": topic,
+                    "subtopic": subtopic,
+                    "result_count": result_count,
+                    "timestamp": ts,
+                }).decode() + "\n")
+                self._search_log_set.add((topic, subtopic))
+            try:
+                self._append_handles[self.search_logs_file].write("".join(lines))
+                self._count_write(self.search_logs_file, len(lines))
+            except Exception as e:
+                logger.error("Error batch appending to %s: %s", self.search_logs_file, e)
+        return count
+
+    def get_all_search_logged_subtopics(self) -> Set[tuple]:
+        """Return a copy of every (topic, subtopic) with a search log.
+
+        Lets callers pre-load the skip set once per run instead of probing
+        per subtopic.
+        """
+        if not self._search_log_loaded:
+            self._load_search_log_set()
+        return set(self._search_log_set)
 
     def check_search_log_exists(self, topic: str, subtopic: str) -> bool:
-        if not self.search_logs_file.exists():
+        if (topic, subtopic) in self._search_log_set:
+            return True
+        if self._search_log_loaded or not self.search_logs_file.exists():
             return False
+        # The eager load failed; fall back to scanning from the tail, where
+        # duplicates are most likely to sit in resume scenarios.
         try:
-            with open(self.search_logs_file, "r", encoding="utf-8") as f:
-                for line in f:
-                    try:
-                        data = json.loads(line)
-                        if data.get("topic") == topic and data.get("subtopic") == subtopic:
-                            return True
-                    except:
-                        pass
-        except:
-            pass
+            for line in self._read_lines_backwards(self.search_logs_file):
+                try:
+                    data = orjson.loads(line)
+                except orjson.JSONDecodeError:
+                    continue
+                if data.get("topic") == topic and data.get("subtopic") == subtopic:
+                    self._search_log_set.add((topic, subtopic))
+                    return True
+        except OSError as e:
+            logger.error("Error reading %s: %s", self.search_logs_file, e)
         return False
 
     def get_pending_videos(self, limit: int = 10) -> List[Dict[str, Any]]:
         """
         Get videos that are in harvested but not in processed or failed.
-        Note: This implementation scans files every time.
+        Uses the in-memory completed cache instead of rescanning both files.
         """
-        completed_urls = set()
-        
-        # Load completed URLs
-        for file_path in [self.processed_file, self.failed_file]:
-            if file_path.exists():
-                try:
-                    with open(file_path, "r", encoding="utf-8") as f:
-                        for line in f:
-                            if not line.strip(): continue
-                            try:
-                                data = json.loads(line)
-                                if "video_url" in data:
-                                    completed_urls.add(data["video_url"])
-                            except:
-                                pass
-                except Exception as e:
-                    logger.error(f"Error reading {file_path}: {e}")
+        completed_urls = self._completed_cache
+
+        # Make buffered harvest writes visible before reading the file back
+        try:
+            self._append_handles[self.harvested_file].flush()
+        except Exception:
+            pass
 
         pending = []
         if self.harvested_file.exists():
             try:
-                with open(self.harvested_file, "r", encoding="utf-8") as f:
-                    for line in f:
-                        if not line.strip(): continue
+                with open(self.harvested_file, "rb", buffering=1 << 19) as f:
+                    f.seek(self._harvested_pos)
+                    # Advance the cursor only past the completed prefix so
+                    # records returned as pending are seen again next call.
+                    safe_pos = f.tell()
+                    advancing = True
+                    while True:
+                        line = f.readline()
+                        if not line:
+                            break
+                        if not line.strip():
+                            if advancing:
+                                safe_pos = f.tell()
+                            continue
                         try:
-                            data = json.loads(line)
-                            url = data.get("video_url")
-                            if url and url not in completed_urls:
-                                pending.append(data)
-                                if len(pending) >= limit:
-                                    break
-                        except:
-                            pass
+                            data = orjson.loads(line)
+                        except orjson.JSONDecodeError:
+                            if advancing:
+                                safe_pos = f.tell()
+                            continue
+                        url = data.get("video_url")
+                        if url and url not in completed_urls:
+                            advancing = False
+                            pending.append(data)
+                            if len(pending) >= limit:
+                                break
+                        elif advancing:
+                            safe_pos = f.tell()
+                if safe_pos != self._harvested_pos:
+                    self._save_harvested_pos(safe_pos)
             except Exception as e:
-                logger.error(f"Error reading {self.harvested_file}: {e}")
+                logger.error("Error reading %s: %s", self.harvested_file, e)
         
         return pending
 
-
-from datetime import datetime
@@ -1,76 +1,323 @@
+import os
 from pathlib import Path
 from typing import Optional, List, Dict, Any, Union
+import asyncio
+import atexit
+import heapq
+import itertools
 import time
+from functools import lru_cache
 import concurrent.futures
 from datetime import datetime, timedelta
-from queue import Queue, PriorityQueue
-import random
-from threading import Thread, Event
+from queue import Queue, Empty
+from threading import Thread, Event, Condition, Lock
 from typing import List, Dict, Any, Optional
 from video_scraper.database.local_storage import LocalStorageManager
 from video_scraper.search import YouTubeSearcher
 from video_scraper.processing import VideoDownloader, VideoProcessor
+from video_scraper.processing.video_processor import process_video_file
 from video_scraper.utils import StateManager, JSONParser, logger
 from video_scraper.config import PROCESSED_DIR, MAX_VIDEO_DURATION_SECONDS
 
 
+# Maps every invalid filename character to "_" in one C-level pass
+_INVALID_TRANS = str.maketrans({c: "_" for c in '<>:"/\\|?*'})
+
+
+class ScheduledHeap:
+    """Min-heap of (ready_time, seq, task) guarded by a Condition.
+
+    Workers block until the earliest task is due instead of polling,
+    re-enqueueing not-yet-ready items and sleeping in a loop. The
+    monotonic seq breaks ties between equal ready times so heapq never
+    falls through to comparing the task dicts (which raises TypeError).
+    Callers only ever see (ready_time, task) pairs.
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._cond = Condition()
+        self._outstanding = 0  # items put but not yet task_done()
+        self._seq = itertools.count()
+        # Maintained alongside push/pop under the condition; read without
+        # the lock by approx_size() (a stale value is fine for progress).
+        self._size = 0
+
+    def put(self, item):
+        ready_time, task = item
+        with self._cond:
+            heapq.heappush(self._heap, (ready_time, next(self._seq), task))
+            self._size += 1
+            self._outstanding += 1
+            self._cond.notify()
+
+    def pop_ready(self, timeout: Optional[float] = None):
+        """Block until the earliest task is due and return it.
+
+        Returns None if timeout elapses with nothing due.
+        """
+        deadline = (time.time() + timeout) if timeout is not None else None
+        with self._cond:
+            while True:
+                now = time.time()
+                if self._heap:
+                    ready_at = self._heap[0][0]
+                    if ready_at <= now:
+                        ready_time, _, task = heapq.heappop(self._heap)
+                        self._size -= 1
+                        return (ready_time, task)
+                    wait = ready_at - now
+                    if deadline is not None:
+                        wait = min(wait, deadline - now)
+                else:
+                    wait = (deadline - now) if deadline is not None else None
+                if wait is not None and wait <= 0:
+                    return None
+                self._cond.wait(wait)
+
+    def bulk_prime(self, items: List[tuple]):
+        """Seed the heap with many items at once: O(n) heapify instead of
+        n sequential push/lock cycles."""
+        if not items:
+            return
+        with self._cond:
+            self._heap.extend(
+                (ready_time, next(self._seq), task) for ready_time, task in items
+            )
+            heapq.heapify(self._heap)
+            self._size += len(items)
+            self._outstanding += len(items)
+            self._cond.notify_all()
+
+    def task_done(self):
+        with self._cond:
+            self._outstanding -= 1
+            if self._outstanding <= 0:
+                self._cond.notify_all()
+
+    def join(self):
+        """Block until every item put on the heap has been marked done."""
+        with self._cond:
+            while self._outstanding > 0:
+                self._cond.wait()
+
+    def qsize(self) -> int:
+        with self._cond:
+            return len(self._heap)
+
+    def approx_size(self) -> int:
+        """Lock-free size read for progress reporting; may be stale."""
+        return self._size
+
+
+class TokenBucket:
+    """Shared token-bucket limiter so N workers pace to a true aggregate
+    rate instead of each sleeping a random interval."""
+
+    def __init__(self, rate: float, capacity: float):
+        self._rate = rate
+        self._capacity = capacity
+        self._tokens = capacity
+        self._last = time.monotonic()
+        self._lock = Lock()
+
+    def acquire(self):
+        """Block until a token is available, then consume it."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self._capacity, self._tokens + (now - self._last) * self._rate
+                )
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                needed = (1 - self._tokens) / self._rate
+            time.sleep(needed)
+
+
+class VideoTask:
+    """One video's trip through the pipeline.
+
+    __slots__ keeps thousands of queued records small (a 9-key dict costs
+    ~3x more) and makes hot-path field access an attribute load instead of
+    a string-hash lookup. Converted to a plain dict only at the storage /
+    state-manager boundary via to_row().
+    """
+
+    __slots__ = (
+        "video_url", "topic", "subtopic", "class_range", "subject",
+        "status", "local_path", "retries", "out_dir",
+    )
+
+    def __init__(
+        self,
+        video_url: str,
+        topic: str,
+        subtopic: str,
+        class_range: str,
+        subject: str,
+        status: str = "pending",
+        local_path: Optional[str] = None,
+        retries: int = 0,
+        out_dir: Optional[str] = None,
+    ):
+        self.video_url = video_url
+        self.topic = topic
+        self.subtopic = subtopic
+        self.class_range = class_range
+        self.subject = subject
+        self.status = status
+        self.local_path = local_path
+        self.retries = retries
+        self.out_dir = out_dir
+
+    @classmethod
+    def from_row(cls, row: Dict[str, Any]) -> "VideoTask":
+        return cls(
+            video_url=row["video_url"],
+            topic=row.get("topic"),
+            subtopic=row.get("subtopic"),
+            class_range=row.get("class_range"),
+            subject=row.get("subject"),
+            status=row.get("status", "pending"),
+            local_path=row.get("local_path"),
+            retries=row.get("retries") or 0,
+            out_dir=row.get("_out_dir"),
+        )
+
+    def to_row(self) -> Dict[str, Any]:
+        return {
+            "video_url": self.video_url,
+            "topic": self.topic,
+            "subtopic": self.subtopic,
+            "class_range": self.class_range,
+            "subject": self.subject,
+            "status": self.status,
+            "local_path": self.local_path,
+            "retries": self.retries,
+            "_out_dir": self.out_dir,
+        }
+
+
 class VideoScraperOrchestrator:
-    def __init__(self, json_path: Union[str, Path]):
+    def __init__(
+        self,
+        json_path: Union[str, Path],
+        max_download_workers: int = 16,
+        max_harvest_workers: int = 16,
+    ):
         self.json_parser = JSONParser(json_path)
+        # I/O-bound pools: downloads and searches spend most of their time
+        # waiting on the network, so they scale well past core count.
+        self.max_download_workers = max_download_workers
+        self.max_harvest_workers = max_harvest_workers
+        # Topic tree is parsed once; every phase iterates this cached list
+        self._topics = self.json_parser.get_all_topics()
         self.db_manager = LocalStorageManager()
         self.state_manager = StateManager()
         self.searcher = None
         self.downloader = VideoDownloader()
         self.processor = VideoProcessor()
+        # ffmpeg work runs in separate processes so encode-heavy stages
+        # spread across physical cores instead of contending in-process.
+        self.proc_pool = concurrent.futures.ProcessPoolExecutor(
+            max_workers=max(1, (os.cpu_count() or 2) // 2)
+        )
         self.start_time: Optional[float] = None
         self.processed_count: int = 0
+        self._last_eta_log: float = 0.0
         self.total_subtopics: int = 0
         self.searched_subtopics: int = 0
         self.max_videos_param: int = 0
         self.expected_total_videos: Optional[int] = None
         self.is_harvesting: bool = False
         
+        # Resolved output dirs keyed by (subject, class_range, topic, subtopic)
+        # so the mkdir syscalls happen once per subtopic, not once per video.
+        self._outdir_cache: Dict[tuple, str] = {}
+        self._outdir_lock = Lock()
+
         self._initialize_searcher()
-        self.failed_queue = Queue()
-        self.download_queue = PriorityQueue()
+
+        # Per-run skip sets: membership probes instead of per-subtopic
+        # state-file/JSONL lookups. Refreshed at process_all_topics entry.
+        self._logged_subtopics = self.db_manager.get_all_search_logged_subtopics()
+        self._completed_subtopics = self.state_manager.get_completed_subtopics()
+
+        self.download_queue = ScheduledHeap()
+        # Bounded hand-off between the download stage and the ffmpeg stage;
+        # maxsize throttles downloaders when encoding is the bottleneck.
+        self.process_queue: Queue = Queue(maxsize=16)
         self.stop_event = Event()
-        self.retry_worker = Thread(target=self._retry_worker_loop, daemon=True)
-        self.retry_worker.start()
+
+        # Aggregate pacing across all workers: ~1 download/s with a burst
+        # of 3, and one search roughly every 3s.
+        self._dl_bucket = TokenBucket(rate=1.0, capacity=3)
+        self._search_bucket = TokenBucket(rate=1 / 3, capacity=1)
+
+        # set = running, clear = paused; is_set() is a lock-free read so
+        # workers can check it per-iteration without touching the state file.
+        self._pause_evt = Event()
+        if not self.state_manager.is_paused():
+            self._pause_evt.set()
+
+        # Completion records buffered here and flushed to storage in
+        # batches of 16 (or after 1s) by the flusher thread.
+        self._update_buf: List[Dict[str, Any]] = []
+        self._update_lock = Lock()
+        self._update_buf_ts = 0.0
+
+        # Every spawned worker is tracked so shutdown can join them
+        # instead of letting daemon threads die mid-write.
+        self._workers: List[Thread] = []
+        atexit.register(self._shutdown)
 
     def _initialize_searcher(self):
         existing_urls = self.db_manager.get_existing_urls()
         self.searcher = YouTubeSearcher(existing_urls, db_manager=self.db_manager)
         logger.info(f"Initialized searcher with {len(existing_urls)} existing URLs")
 
-    def _sanitize_filename(self, name: str) -> str:
-        invalid = '<>:"/\\|?*'
-        for ch in invalid:
-            name = name.replace(ch, "_")
-        name = name.strip().strip(".")
-        if len(name) > 150:
-            name = name[:150]
-        return name
-
-    def _build_output_dir(self, subject: str, class_range: str, topic: str, subtopic: str) -> Path:
-        parts = [
-            PROCESSED_DIR,
-            self._sanitize_filename(subject),
-            self._sanitize_filename(class_range),
-            self._sanitize_filename(topic),
-            self._sanitize_filename(subtopic),
-        ]
-        out_dir = Path(parts[0]) / Path(*parts[1:])
-        out_dir.mkdir(parents=True, exist_ok=True)
-        return out_dir
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _sanitize_filename(name: str) -> str:
+        return name.translate(_INVALID_TRANS).strip().strip(".")[:150]
+
+    def _build_output_dir(self, subject: str, class_range: str, topic: str, subtopic: str) -> str:
+        key = (subject, class_range, topic, subtopic)
+        with self._outdir_lock:
+            out_dir = self._outdir_cache.get(key)
+            if out_dir is not None:
+                return out_dir
+            # os.path.join on strings is a fraction of the cost of chained
+            # pathlib construction, and callers only ever append a filename
+            out_dir = os.path.join(
+                str(PROCESSED_DIR),
+                self._sanitize_filename(subject),
+                self._sanitize_filename(class_range),
+                self._sanitize_filename(topic),
+                self._sanitize_filename(subtopic),
+            )
+            os.makedirs(out_dir, exist_ok=True)
+            self._outdir_cache[key] = out_dir
+            return out_dir
 
     def _log_eta(self):
         try:
             if self.start_time is None:
                 return
+
+            # Amortize the strftime/format/log cost: at most one line per
+            # 5s, plus one every 10th video regardless.
+            now = time.time()
+            if now - self._last_eta_log < 5.0 and self.processed_count % 10 != 0:
+                return
+            self._last_eta_log = now
             
             elapsed = time.time() - self.start_time
             processed = self.processed_count
-            queue_size = self.download_queue.qsize()
+            queue_size = self.download_queue.approx_size()
             
             total_subtopics = self.total_subtopics
             searched_subtopics = self.searched_subtopics
@@ -108,109 +355,113 @@ class VideoScraperOrchestrator:
             pass
 
     def _check_pause(self):
-        if self.state_manager.is_paused():
+        if not self._pause_evt.is_set():
             logger.info("Operation paused by user")
             return True
         return False
     
-    def _enqueue_failed_query(self, topic: str, subtopic: str, class_range: str, subject: str, max_videos: int):
+    def _enqueue_failed_query(self, topic: str, subtopic: str, class_range: str, subject: str, max_videos: int, attempts: int = 0):
         item = {
+            "kind": "search",
             "topic": topic,
             "subtopic": subtopic,
             "class_range": class_range,
             "subject": subject,
             "max_videos": max_videos,
-            "attempts": 0,
+            "attempts": attempts,
         }
-        self.failed_queue.put(item)
+        ready_time = time.time() + min(30, 2 ** attempts)
+        self.download_queue.put((ready_time, item))
         logger.info(f"Queued for retry: {topic} - {subtopic}")
-    
-    def _retry_worker_loop(self):
-        while not self.stop_event.is_set():
-            try:
-                item = self.failed_queue.get(timeout=1)
-            except Exception:
-                continue
-            topic = item.get("topic")
-            subtopic = item.get("subtopic")
-            class_range = item.get("class_range")
-            subject = item.get("subject")
-            max_videos = int(item.get("max_videos", 5))
-            attempts = int(item.get("attempts", 0))
-            delay = min(30, 2 ** attempts)
-            time.sleep(delay)
-            try:
-                query = f"{topic} {subtopic}"
-                urls = self.searcher.search_videos(
-                    query,
-                    max_results=max_videos,
-                    topic=topic,
-                    subtopic=subtopic,
-                )
-                if urls:
-                    videos_to_insert = []
-                    for url in urls:
-                        videos_to_insert.append({
-                            "video_url": url,
-                            "topic": topic,
-                            "subtopic": subtopic,
-                            "class_range": class_range,
-                            "subject": subject,
-                            "status": "pending",
-                            "local_path": None,
-                        })
-                    new_count = self.db_manager.batch_insert_videos(videos_to_insert)
-                    logger.info(f"Retry stored {new_count} new pending videos for {subtopic}")
-                else:
-                    item["attempts"] = attempts + 1
-                    if item["attempts"] <= 5:
-                        self.failed_queue.put(item)
-                        logger.info(f"Requeued empty result for {subtopic}, attempt {item['attempts']}")
-                    else:
-                        logger.warning(f"Dropped after retries: {subtopic}")
-            except Exception as e:
-                item["attempts"] = attempts + 1
-                if item["attempts"] <= 5:
-                    self.failed_queue.put(item)
-                    logger.warning(f"Retry error for {subtopic}, attempt {item['attempts']}: {e}")
-                else:
-                    logger.error(f"Dropped after failures: {subtopic}: {e}")
-            finally:
-                try:
-                    self.failed_queue.task_done()
-                except Exception:
-                    pass
 
-    def _process_single_video(
-        self,
-        video_url: str,
-        topic: str,
-        subtopic: str,
-        class_range: str,
-        subject: str,
-    ) -> bool:
+    def _run_search_task(self, item: Dict[str, Any]):
+        """Retry a failed search query popped from the scheduled heap."""
+        topic = item.get("topic")
+        subtopic = item.get("subtopic")
+        class_range = item.get("class_range")
+        subject = item.get("subject")
+        max_videos = int(item.get("max_videos", 5))
+        attempts = int(item.get("attempts", 0))
         try:
-            if self._check_pause():
-                return False
+            query = f"{topic} {subtopic}"
+            urls = self.searcher.search_videos(
+                query,
+                max_results=max_videos,
+                topic=topic,
+                subtopic=subtopic,
+            )
+            if urls:
+                base = {
+                    "topic": topic,
+                    "subtopic": subtopic,
+                    "class_range": class_range,
+                    "subject": subject,
+                    "status": "pending",
+                    "local_path": None,
+                }
+                videos_to_insert = [dict(base, video_url=url) for url in urls]
+                new_count = self.db_manager.batch_insert_videos(videos_to_insert)
+                logger.info(f"Retry stored {new_count} new pending videos for {subtopic}")
+            elif attempts + 1 <= 5:
+                self._enqueue_failed_query(topic, subtopic, class_range, subject, max_videos, attempts + 1)
+                logger.info(f"Requeued empty result for {subtopic}, attempt {attempts + 1}")
+            else:
+                logger.warning(f"Dropped after retries: {subtopic}")
+        except Exception as e:
+            if attempts + 1 <= 5:
+                self._enqueue_failed_query(topic, subtopic, class_range, subject, max_videos, attempts + 1)
+                logger.warning(f"Retry error for {subtopic}, attempt {attempts + 1}: {e}")
+            else:
+                logger.error(f"Dropped after failures: {subtopic}: {e}")
 
-            task = {
-                "video_url": video_url,
-                "topic": topic,
-                "subtopic": subtopic,
-                "class_range": class_range,
-                "subject": subject,
-            }
-            self.state_manager.set_current_task(task)
+    def _download_step(self, task: VideoTask) -> Optional[Dict[str, Any]]:
+        """Network-bound pipeline stage: download the video and stage it
+        for the ffmpeg workers. Returns the process-queue item, or None
+        on failure."""
+        video_url = task.video_url
+        try:
+            if self._check_pause():
+                return None
 
+            self.state_manager.set_current_task(task.to_row())
             logger.info(f"Processing video: {video_url}")
 
             dl = self.downloader.download_with_info(video_url)
             if not dl:
                 logger.warning(f"Failed to download: {video_url}")
-                self.state_manager.add_failed_task(task, "Download failed")
-                return False
-            downloaded_file = dl["path"]
+                self.state_manager.add_failed_task(task.to_row(), "Download failed")
+                return None
+
             info = dl["info"] or {}
+            title = info.get("title") or "video"
+            # Tasks enqueued by the producer carry their resolved output
+            # dir; tasks loaded from older DB rows may not.
+            out_dir = task.out_dir or self._build_output_dir(
+                task.subject, task.class_range, task.topic, task.subtopic
+            )
+            safe_title = self._sanitize_filename(title)
+            video_id = info.get("id") or video_url.split("v=")[-1]
+            output_path = os.path.join(out_dir, f"{safe_title}_{video_id}.mp4")
+
+            return {
+                "downloaded": dl["path"],
+                "output": output_path,
+                "info": info,
+                "task": task,
+            }
+
+        except Exception as e:
+            logger.error(f"Error downloading video {video_url}: {e}")
+            self.state_manager.add_failed_task(task.to_row(), str(e))
+            return None
+
+    def _process_step(self, item: Dict[str, Any]) -> bool:
+        """CPU/disk-bound pipeline stage: re-encode via the process pool
+        and finalize the DB record."""
+        task = item["task"]
+        video_url = task.video_url
+        info = item["info"]
+        try:
             title = info.get("title") or "video"
             channel = info.get("channel") or info.get("uploader")
             duration = info.get("duration")
@@ -222,53 +473,56 @@ class VideoScraperOrchestrator:
                 except Exception:
                     upload_date = None
 
-            out_dir = self._build_output_dir(subject, class_range, topic, subtopic)
-            safe_title = self._sanitize_filename(title)
-            video_id = info.get("id") or video_url.split("v=")[-1]
-            output_path = out_dir / f"{safe_title}_{video_id}.mp4"
-
-            processed_file = self.processor.process_video(downloaded_file, output_path=output_path, delete_original=True)
+            fut = self.proc_pool.submit(
+                process_video_file, item["downloaded"], item["output"], True
+            )
+            processed_file = fut.result()
             if not processed_file:
-                logger.warning(f"Failed to process: {downloaded_file}")
-                self.state_manager.add_failed_task(task, "Processing failed")
+                logger.warning(f"Failed to process: {item['downloaded']}")
+                self.state_manager.add_failed_task(task.to_row(), "Processing failed")
                 return False
 
-            # Update the existing video record with details and status
-            success = self.db_manager.update_video_details(
-                video_url=video_url,
-                local_path=str(processed_file),
-                duration=duration,
-                title=title,
-                channel=channel,
-                upload_date=upload_date,
-                status="processed",
-                full_info=info
-            )
+            # Buffer the completion record; the flusher batches the
+            # actual storage writes. The task row rides along so state
+            # only records the completion once the write has landed.
+            self._queue_db_update({
+                "video_url": video_url,
+                "local_path": str(processed_file),
+                "duration": duration,
+                "title": title,
+                "channel": channel,
+                "upload_date": upload_date,
+                "status": "processed",
+                "full_info": info,
+                "task_row": task.to_row(),
+            })
 
-            if success:
-                self.state_manager.add_completed_task(task)
-                # No need to update existing_urls as it's already there
-                logger.info(f"Successfully processed and stored: {video_url}")
-                self.processed_count += 1
-                self._log_eta()
-                return True
-            else:
-                logger.error(f"Failed to update database record: {video_url}")
-                self.state_manager.add_failed_task(task, "Database update failed")
-                return False
+            # No need to update existing_urls as it's already there
+            logger.info(f"Successfully processed and stored: {video_url}")
+            self.processed_count += 1
+            self._log_eta()
+            return True
 
         except Exception as e:
             logger.error(f"Error processing video {video_url}: {e}")
-            task = {
-                "video_url": video_url,
-                "topic": topic,
-                "subtopic": subtopic,
-                "class_range": class_range,
-                "subject": subject,
-            }
-            self.state_manager.add_failed_task(task, str(e))
+            self.state_manager.add_failed_task(task.to_row(), str(e))
             return False
 
+    def _process_single_video(
+        self,
+        video_url: str,
+        topic: str,
+        subtopic: str,
+        class_range: str,
+        subject: str,
+    ) -> bool:
+        """Run both pipeline stages inline (synchronous process_topic path)."""
+        task = VideoTask(video_url, topic, subtopic, class_range, subject)
+        item = self._download_step(task)
+        if item is None:
+            return False
+        return self._process_step(item)
+
     def process_topic(
         self,
         topic_data: Dict[str, Any],
@@ -286,15 +540,17 @@ class VideoScraperOrchestrator:
             if self._check_pause():
                 break
 
-            # Check if subtopic is already completed
-            if self.state_manager.is_subtopic_completed(topic, subtopic):
+            # Check if subtopic is already completed (preloaded set)
+            key = (topic, subtopic)
+            if key in self._completed_subtopics:
                 logger.info(f"Skipping completed subtopic: {topic} - {subtopic}")
                 continue
 
             # Check if we have recent search logs for this subtopic (backup for lost local state)
-            if self.db_manager.check_search_log_exists(topic, subtopic):
+            if key in self._logged_subtopics:
                 logger.info(f"Found existing search logs for {topic} - {subtopic}, marking as completed")
                 self.state_manager.add_completed_subtopic(topic, subtopic)
+                self._completed_subtopics.add(key)
                 continue
 
             query = f"{topic} {subtopic}"
@@ -325,10 +581,11 @@ class VideoScraperOrchestrator:
             # Mark subtopic as completed if we didn't pause
             if not self._check_pause():
                 self.state_manager.add_completed_subtopic(topic, subtopic)
+                self._completed_subtopics.add(key)
 
         return stats
 
-    def _harvest_subtopic(self, topic, subtopic, class_range, subject, max_videos_per_subtopic):
+    async def _harvest_subtopic_async(self, topic, subtopic, class_range, subject, max_videos_per_subtopic):
         max_retries = 2
         for attempt in range(max_retries + 1):
             try:
@@ -337,13 +594,15 @@ class VideoScraperOrchestrator:
                     logger.info(f"Skipping already searched: {topic} - {subtopic}")
                     return
 
-                # 2. Search
+                # 2. Search. The ddgs client is blocking, so the call runs
+                # in the default thread pool while other coroutines proceed.
                 query = f"{topic} {subtopic}"
                 logger.info(f"Harvesting: {query}")
-                urls = self.searcher.search_videos_for_subtopic(
+                urls = await asyncio.to_thread(
+                    self.searcher.search_videos_for_subtopic,
                     topic=topic,
                     subtopic=subtopic,
-                    max_results=max_videos_per_subtopic
+                    max_results=max_videos_per_subtopic,
                 )
                 if not urls:
                     raise ValueError("No results")
@@ -370,108 +629,306 @@ class VideoScraperOrchestrator:
                     logger.error(f"Failed to harvest subtopic '{subtopic}' after {max_retries + 1} attempts")
                     self._enqueue_failed_query(topic, subtopic, class_range, subject, max_videos_per_subtopic)
                 else:
-                    time.sleep(2) # Small backoff
+                    await asyncio.sleep(2) # Small backoff
 
-    def harvest_links(self, max_videos_per_subtopic: int = 10):
-        """Phase 1: Search and store all links without downloading."""
-        logger.info("Starting Phase 1: Harvesting links from DuckDuckGo with 6 workers...")
-        
-        with concurrent.futures.ThreadPoolExecutor(max_workers=6) as executor:
-            futures = []
-            for topic_data in self.json_parser.get_all_topics():
+    async def _run_harvest(self, max_videos_per_subtopic: int):
+        """Harvest every subtopic, max_harvest_workers at a time.
+
+        Worker coroutines pull subtopics from a bounded queue that is
+        fed lazily from the topic list, so in-flight work is capped
+        without materializing one task per subtopic up front.
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=2 * self.max_harvest_workers)
+
+        async def worker():
+            while True:
+                entry = await queue.get()
+                try:
+                    if entry is None:
+                        return
+                    topic, subtopic, class_range, subject = entry
+                    if self._check_pause():
+                        continue
+                    await self._harvest_subtopic_async(
+                        topic, subtopic, class_range, subject, max_videos_per_subtopic
+                    )
+                finally:
+                    queue.task_done()
+
+        workers = [
+            asyncio.create_task(worker()) for _ in range(self.max_harvest_workers)
+        ]
+        for topic_data in self._topics:
+            for subtopic in topic_data["subtopics"]:
+                await queue.put(
+                    (
+                        topic_data["topic"],
+                        subtopic,
+                        topic_data["class_range"],
+                        topic_data["subject"],
+                    )
+                )
+        for _ in workers:
+            await queue.put(None)
+        await asyncio.gather(*workers)
+
+        # Searches that exhausted their inline retries were scheduled on
+        # the retry heap, and during a standalone phase-1 harvest no
+        # pipeline worker is running to pop it — drain it here or those
+        # retries are silently dropped. _run_search_task can re-queue
+        # itself with backoff, hence looping until the heap is empty.
+        # When pipeline workers are up they consume search retries
+        # themselves, so the drain is skipped.
+        if not self._workers:
+            while self.download_queue.qsize() > 0:
                 if self._check_pause():
                     break
-                
-                topic = topic_data["topic"]
-                subtopics = topic_data["subtopics"]
-                class_range = topic_data["class_range"]
-                subject = topic_data["subject"]
-                
-                for subtopic in subtopics:
-                    futures.append(
-                        executor.submit(
-                            self._harvest_subtopic,
-                            topic,
-                            subtopic,
-                            class_range,
-                            subject,
-                            max_videos_per_subtopic
-                        )
-                    )
-            
-            # Wait for all tasks to complete
-            for future in concurrent.futures.as_completed(futures):
-                try:
-                    future.result()
-                except Exception as e:
-                    logger.error(f"Worker task failed with unhandled exception: {e}")
+                item = self.download_queue.pop_ready(timeout=2)
+                if item is None:
+                    continue
+                ready_time, task = item
+                if isinstance(task, dict):
+                    await asyncio.to_thread(self._run_search_task, task)
+                    self.download_queue.task_done()
+                else:
+                    # Video work primed for the pipeline phase; put it
+                    # back and leave the heap to the download workers.
+                    self.download_queue.put((ready_time, task))
+                    self.download_queue.task_done()
+                    break
+
+    def harvest_links(self, max_videos_per_subtopic: int = 10):
+        """Phase 1: Search and store all links without downloading."""
+        logger.info(
+            f"Starting Phase 1: Harvesting links from DuckDuckGo "
+            f"(async, {self.max_harvest_workers} in flight)..."
+        )
+        asyncio.run(self._run_harvest(max_videos_per_subtopic))
 
     def _download_worker(self):
         """
         Worker thread that pulls tasks from the download queue.
-        Implements random delays and exponential backoff for retries.
+        Paced by the shared token bucket, with exponential backoff for retries.
         """
         while not self.stop_event.is_set():
             try:
-                # Get item from queue (priority_time, task_data)
-                priority_time, task = self.download_queue.get(timeout=2)
-                
-                # If it's not time yet, put it back and wait
-                now = time.time()
-                if priority_time > now:
-                    self.download_queue.put((priority_time, task))
-                    time.sleep(1) # Wait a bit before checking again
+                # Blocks until the earliest scheduled task is due
+                item = self.download_queue.pop_ready(timeout=2)
+                if item is None:
                     continue
-                
-                # Random delay to be less aggressive
-                delay = random.uniform(1, 3)
-                time.sleep(delay)
+                priority_time, task = item
+
+                # Retried search queries share the same scheduled heap
+                # and stay plain dicts; video work is a VideoTask.
+                if not isinstance(task, VideoTask):
+                    self._run_search_task(task)
+                    self.download_queue.task_done()
+                    continue
+
+                # Shared rate limit instead of a per-worker random sleep
+                self._dl_bucket.acquire()
                 
                 if self._check_pause():
-                    # If paused, put back with same priority
+                    # If paused, put back with same priority and block on the
+                    # event instead of burning poll cycles
                     self.download_queue.put((priority_time, task))
-                    time.sleep(2)
+                    self.download_queue.task_done()
+                    self._pause_evt.wait(timeout=2)
                     continue
 
-                video_url = task["video_url"]
-                # Process the video
-                success = self._process_single_video(
-                    video_url=video_url,
-                    topic=task["topic"],
-                    subtopic=task["subtopic"],
-                    class_range=task["class_range"],
-                    subject=task["subject"]
-                )
-                
-                if not success:
-                    # Handle Retry
-                    retries = task.get("retries", 0) + 1
-                    max_retries = 5
-                    
-                    if retries <= max_retries:
-                        backoff_delay = (2 ** retries) * 5 # 5s, 10s, 20s, 40s, 80s
-                        next_time = time.time() + backoff_delay
-                        task["retries"] = retries
-                        
-                        logger.warning(f"Download/Process failed for {video_url}. Retrying in {backoff_delay}s (Attempt {retries}/{max_retries})")
-                        self.download_queue.put((next_time, task))
-                    else:
-                        logger.error(f"Max retries reached for {video_url}. Giving up.")
-                        self.db_manager.mark_video_failed(video_url, "Max retries reached")
-                
+                pipeline_item = self._download_step(task)
+                if pipeline_item is not None:
+                    # Hand off to the ffmpeg stage; its worker calls
+                    # task_done() once the record is finalized. put()
+                    # blocks when encoding falls behind (backpressure).
+                    self.process_queue.put(pipeline_item)
+                    continue
+
+                self._retry_or_fail(task)
                 self.download_queue.task_done()
                 
             except Exception:
                 # Empty queue or other error
                 pass
 
+    def _process_worker(self):
+        """Worker thread for the ffmpeg stage of the pipeline."""
+        while not self.stop_event.is_set():
+            try:
+                item = self.process_queue.get(timeout=2)
+            except Empty:
+                continue
+            try:
+                if not self._process_step(item):
+                    self._retry_or_fail(item["task"])
+            except Exception:
+                # Same defensive net as the download worker: an error
+                # escaping the retry path must not kill the thread —
+                # with so few process workers a dead one leaves the
+                # downloaders blocked on the bounded queue forever.
+                logger.exception("Process worker error")
+            finally:
+                self.process_queue.task_done()
+                self.download_queue.task_done()
+
+    def _retry_or_fail(self, task: VideoTask):
+        """Re-enqueue a failed task with exponential backoff, or give up
+        after max retries."""
+        video_url = task.video_url
+        retries = task.retries + 1
+        max_retries = 5
+
+        if retries <= max_retries:
+            backoff_delay = (2 ** retries) * 5 # 5s, 10s, 20s, 40s, 80s
+            next_time = time.time() + backoff_delay
+            task.retries = retries
+
+            logger.warning(f"Download/Process failed for {video_url}. Retrying in {backoff_delay}s (Attempt {retries}/{max_retries})")
+            self.download_queue.put((next_time, task))
+        else:
+            logger.error(f"Max retries reached for {video_url}. Giving up.")
+            self.db_manager.mark_video_failed(video_url, "Max retries reached")
+
+    def _queue_db_update(self, record: Dict[str, Any]):
+        """Buffer one completion record; flush when 16 have accumulated."""
+        with self._update_lock:
+            if not self._update_buf:
+                self._update_buf_ts = time.time()
+            self._update_buf.append(record)
+            if len(self._update_buf) < 16:
+                return
+            batch = self._update_buf
+            self._update_buf = []
+        self._write_db_updates(batch)
+
+    def _flush_db_updates(self, force: bool = False):
+        with self._update_lock:
+            if not self._update_buf:
+                return
+            if not force and time.time() - self._update_buf_ts < 1.0:
+                return
+            batch = self._update_buf
+            self._update_buf = []
+        self._write_db_updates(batch)
+
+    def _write_db_updates(self, batch: List[Dict[str, Any]]):
+        """Persist a completion batch; failed records are re-buffered.
+
+        A video must not be counted complete while absent from the
+        processed log, so when the batch write raises the records go
+        back into the buffer for the next flush. After three failed
+        write attempts a record's URL is marked failed instead, so it
+        stays detectable and retryable on a later run.
+        """
+        try:
+            self.db_manager.batch_update_video_details(batch)
+        except Exception as e:
+            survivors = []
+            for rec in batch:
+                rec["_write_attempts"] = rec.get("_write_attempts", 0) + 1
+                if rec["_write_attempts"] <= 3:
+                    survivors.append(rec)
+                else:
+                    video_url = rec["video_url"]
+                    logger.error(f"Giving up on completion record for {video_url}: {e}")
+                    self.db_manager.mark_video_failed(
+                        video_url, f"Completion record write failed: {e}"
+                    )
+                    task_row = rec.get("task_row")
+                    if task_row is not None:
+                        self.state_manager.add_failed_task(
+                            task_row, "Completion record write failed"
+                        )
+            if survivors:
+                with self._update_lock:
+                    if not self._update_buf:
+                        self._update_buf_ts = time.time()
+                    self._update_buf = survivors + self._update_buf
+                logger.warning(
+                    f"Re-buffered {len(survivors)} completion records after write failure: {e}"
+                )
+            return
+
+        for rec in batch:
+            task_row = rec.get("task_row")
+            if task_row is not None:
+                self.state_manager.add_completed_task(task_row)
+
+    def _update_flusher(self):
+        """Flush completion records that have sat in the buffer for >1s."""
+        while not self.stop_event.wait(1):
+            self._flush_db_updates()
+        self._flush_db_updates(force=True)
+
+    def _start_pipeline_workers(self) -> List[Thread]:
+        """Spawn the download pool and the smaller ffmpeg pool."""
+        workers = []
+        for _ in range(self.max_download_workers):
+            t = Thread(target=self._download_worker, daemon=True)
+            t.start()
+            workers.append(t)
+        for _ in range(min(2, os.cpu_count() or 2)):
+            t = Thread(target=self._process_worker, daemon=True)
+            t.start()
+            workers.append(t)
+        monitor = Thread(target=self._queue_monitor, daemon=True)
+        monitor.start()
+        workers.append(monitor)
+        flusher = Thread(target=self._update_flusher, daemon=True)
+        flusher.start()
+        workers.append(flusher)
+        self._workers.extend(workers)
+        return workers
+
+    def _queue_monitor(self):
+        """Sample queue depth every 10s and suggest scaling the pool when
+        workers clearly can't keep up."""
+        last_processed = self.processed_count
+        while not self.stop_event.wait(10):
+            depth = self.download_queue.approx_size()
+            rate = (self.processed_count - last_processed) / 10.0
+            last_processed = self.processed_count
+            if depth > 100 and rate < self.max_download_workers:
+                logger.info(
+                    f"Download queue depth {depth} at {rate:.1f} videos/s; "
+                    f"consider raising max_download_workers (now {self.max_download_workers})"
+                )
+
+    def _shutdown(self):
+        """Stop workers, drain the process pool and join every thread.
+
+        Daemon threads killed at interpreter exit can leave half-written
+        records and orphaned ffmpeg children; joining here makes repeated
+        runs in one process leak-free.
+        """
+        self.stop_event.set()
+        self._pause_evt.set()  # unblock workers parked on the pause event
+        for t in self._workers:
+            t.join(timeout=5)
+        self._workers.clear()
+        self.proc_pool.shutdown(wait=True)
+        # Nothing is producing records any more; drain whatever is left
+        self._flush_db_updates(force=True)
+
     def _search_producer(self, max_videos_per_subtopic: int):
         """
         Producer thread that searches for videos serially and populates the download queue.
         """
         logger.info("Starting Search Producer (Serial)...")
-        
-        for topic_data in self.json_parser.get_all_topics():
+
+        # Accumulate rows across subtopics and flush in batches so the
+        # storage layer amortizes its writes; tasks still hit the download
+        # queue immediately so workers aren't starved.
+        pending_rows: List[Dict[str, Any]] = []
+        pending_logs: List[tuple] = []
+
+        def flush_pending():
+            if pending_rows or pending_logs:
+                self.db_manager.batch_insert_videos_and_logs(pending_rows, pending_logs)
+                pending_rows.clear()
+                pending_logs.clear()
+
+        for topic_data in self._topics:
             if self._check_pause() or self.stop_event.is_set():
                 break
             
@@ -485,10 +942,9 @@ class VideoScraperOrchestrator:
                 if self._check_pause() or self.stop_event.is_set():
                     break
                 
-                # Check if already done
-                if self.state_manager.is_subtopic_completed(topic, subtopic):
-                    continue
-                if self.db_manager.check_search_log_exists(topic, subtopic):
+                # Check if already done (preloaded sets, O(1))
+                key = (topic, subtopic)
+                if key in self._completed_subtopics or key in self._logged_subtopics:
                     continue
                 
                 # Search
@@ -501,35 +957,37 @@ class VideoScraperOrchestrator:
                     )
                     
                     if urls:
+                        # Resolve (and mkdir) the output dir once per
+                        # subtopic rather than once per video.
+                        out_dir = self._build_output_dir(
+                            subject, class_range, topic, subtopic
+                        )
+                        now = time.time()
                         videos_to_insert = []
                         for url in urls:
-                            task = {
-                                "video_url": url,
-                                "topic": topic,
-                                "subtopic": subtopic,
-                                "class_range": class_range,
-                                "subject": subject,
-                                "status": "pending",
-                                "local_path": None,
-                                "retries": 0
-                            }
-                            videos_to_insert.append(task)
+                            task = VideoTask(
+                                url, topic, subtopic, class_range, subject,
+                                out_dir=out_dir,
+                            )
+                            videos_to_insert.append(task.to_row())
                             # Add to download queue immediately
-                            self.download_queue.put((time.time(), task))
+                            self.download_queue.put((now, task))
                         
-                        self.db_manager.batch_insert_videos(videos_to_insert)
+                        pending_rows.extend(videos_to_insert)
+                        pending_logs.append((topic, subtopic, len(urls)))
+                        self._logged_subtopics.add(key)
+                        if len(pending_rows) >= 200:
+                            flush_pending()
                         logger.info(f"Queued {len(urls)} videos for {subtopic}")
-                        
-                        # Log success
-                        self.db_manager.insert_search_log(topic, subtopic, len(urls))
-                    
-                    # Be nice, wait between searches
-                    time.sleep(random.uniform(2, 5))
+
+                    # Be nice, pace searches through the shared bucket
+                    self._search_bucket.acquire()
                     
                 except Exception as e:
                     logger.error(f"Error harvesting {subtopic}: {e}")
                     time.sleep(5)
 
+        flush_pending()
         logger.info("Search Producer finished.")
         self.is_harvesting = False
 
@@ -541,22 +999,25 @@ class VideoScraperOrchestrator:
     ) -> Dict[str, Any]:
         self.start_time = time.time()
         self.max_videos_param = max_videos_per_subtopic
-        self.total_subtopics = 0
-        for t in self.json_parser.get_all_topics():
-            self.total_subtopics += len(t.get("subtopics", []))
+        self.total_subtopics = self.json_parser.get_total_subtopic_count()
         self.searched_subtopics = 0
         
         if resume:
             self.state_manager.resume()
         else:
             self.state_manager.reset_state()
+        self._pause_evt.set()
+
+        # Refresh skip sets after the state reset/resume above
+        self._logged_subtopics = self.db_manager.get_all_search_logged_subtopics()
+        self._completed_subtopics = self.state_manager.get_completed_subtopics()
 
-        # Load existing pending videos into queue first
+        # Load existing pending videos and prime the heap in one shot
         pending_videos = self.db_manager.get_pending_videos(limit=1000)
-        for vid in pending_videos:
-            task = vid.copy()
-            task["retries"] = 0
-            self.download_queue.put((time.time(), task))
+        now = time.time()
+        self.download_queue.bulk_prime(
+            [(now, VideoTask.from_row(vid)) for vid in pending_videos]
+        )
         logger.info(f"Loaded {len(pending_videos)} pending videos from DB")
 
         if mode == "harvest":
@@ -567,11 +1028,7 @@ class VideoScraperOrchestrator:
         elif mode == "process":
             # Just start workers
             self.is_harvesting = False
-            workers = []
-            for _ in range(3):
-                t = Thread(target=self._download_worker, daemon=True)
-                t.start()
-                workers.append(t)
+            workers = self._start_pipeline_workers()
             
             # Wait until queue is empty
             self.download_queue.join()
@@ -580,11 +1037,7 @@ class VideoScraperOrchestrator:
             self.is_harvesting = True
             
             # Start Workers
-            workers = []
-            for _ in range(3):
-                t = Thread(target=self._download_worker, daemon=True)
-                t.start()
-                workers.append(t)
+            workers = self._start_pipeline_workers()
             
             # Start Producer (in main thread or separate)
             # We run producer in main thread to block
@@ -594,10 +1047,7 @@ class VideoScraperOrchestrator:
             logger.info("Waiting for downloads to complete...")
             self.download_queue.join()
 
-        try:
-            self.stop_event.set()
-        except Exception:
-            pass
+        self._shutdown()
         
         return {"status": "completed", "mode": mode}
 
@@ -609,9 +1059,11 @@ class VideoScraperOrchestrator:
             logger.info("Harvesting phase finished. Processors will stop when queue is empty.")
 
     def pause(self):
+        self._pause_evt.clear()
         self.state_manager.pause()
 
     def resume(self):
+        self._pause_evt.set()
         self.state_manager.resume()
 
     def get_progress(self) -> Dict[str, Any]:
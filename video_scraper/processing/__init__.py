@@ -1,4 +1,5 @@
 from .downloader import VideoDownloader
 from .video_processor import VideoProcessor
+from .pipeline import download_and_process
 
-__all__ = ["VideoDownloader", "VideoProcessor"]
+__all__ = ["VideoDownloader", "VideoProcessor", "download_and_process"]
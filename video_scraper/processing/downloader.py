@@ -1,7 +1,12 @@
 import yt_dlp
+import os
 import time
 import random
-import concurrent.futures
+import asyncio
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
+from urllib.parse import urlparse
 from pathlib import Path
 from typing import Optional, Dict, Any, List
 from video_scraper.config import (
@@ -17,9 +22,67 @@ from video_scraper.config import (
     BACKOFF_FACTOR,
     MAX_CONCURRENT_DOWNLOADS
 )
-from video_scraper.utils import logger
+from video_scraper.utils import logger, SESSION
+
+
+class HostLimiter:
+    """Per-host pacing for download workers.
+
+    A worker proceeds immediately while the host's bucket has capacity
+    instead of sleeping a fixed random interval after every video, and a
+    rate-limited host backs off on its own without stalling downloads
+    from other hosts.
+    """
+
+    def __init__(self, min_interval: float = DOWNLOAD_DELAY_MIN, per_host: int = 4):
+        self._min_interval = min_interval
+        self._per_host = per_host
+        self._lock = threading.Lock()
+        self._sems: Dict[str, threading.Semaphore] = {}
+        self._next_ok: Dict[str, float] = {}
+
+    def _sem_for(self, host: str) -> threading.Semaphore:
+        with self._lock:
+            sem = self._sems.get(host)
+            if sem is None:
+                sem = threading.Semaphore(self._per_host)
+                self._sems[host] = sem
+            return sem
+
+    @contextmanager
+    def acquire(self, host: Optional[str]):
+        host = host or "_default"
+        sem = self._sem_for(host)
+        sem.acquire()
+        try:
+            while True:
+                with self._lock:
+                    now = time.monotonic()
+                    wait = self._next_ok.get(host, 0.0) - now
+                    if wait <= 0:
+                        # Aggregate spacing: per_host concurrent workers
+                        # share one min_interval between starts
+                        self._next_ok[host] = now + self._min_interval / self._per_host
+                        break
+                time.sleep(wait)
+            yield
+        finally:
+            sem.release()
+
+    def backoff(self, host: Optional[str], delay: float):
+        """Push the host's next allowed start out by `delay` seconds."""
+        host = host or "_default"
+        with self._lock:
+            self._next_ok[host] = max(
+                self._next_ok.get(host, 0.0), time.monotonic() + delay
+            )
+
 
 class VideoDownloader:
+    # Containers yt-dlp may produce; everything else (.part, .json, .ytdl)
+    # is skipped before any stat happens
+    _VIDEO_EXTS = ("mp4", "webm", "mkv", "flv", "avi", "mov")
+
     def __init__(self):
         self.temp_dir = TEMP_DIR
         self.temp_dir.mkdir(parents=True, exist_ok=True)
@@ -33,7 +96,27 @@ class VideoDownloader:
         else:
             logger.warning(f"⚠️ Cookie file not found at {self.cookie_file}. Continuing without authentication.")
 
+        # Per-thread YoutubeDL instances. Each instance keeps its opener
+        # (and thus its sockets to youtube.com/googlevideo.com) alive, so
+        # reusing one per worker thread avoids a fresh TLS handshake for
+        # every metadata probe and download. YoutubeDL is not documented
+        # as thread-safe, hence thread-local rather than one global.
+        self._tls = threading.local()
+
+        # Shared pacing across all worker threads, keyed on host
+        self._limiter = HostLimiter()
+
+        # Options never change within a session, so build the dict once;
+        # per-call variation is just the output template.
+        self._ydl_opts_template = self._build_ydl_options()
+
     def _get_ydl_options(self, output_path: str = None) -> Dict[str, Any]:
+        """Shallow copy of the session template with the target output path."""
+        opts = self._ydl_opts_template.copy()
+        opts["outtmpl"] = output_path if output_path else str(self.temp_dir / "%(id)s.%(ext)s")
+        return opts
+
+    def _build_ydl_options(self) -> Dict[str, Any]:
         """
         Returns optimized yt-dlp options with 'Get Anything' Fallback.
         """
@@ -71,79 +154,200 @@ class VideoDownloader:
             # --- 4. Filters ---
             "match_filter": self._filter_shorts_and_duration,
 
+            # Record the realized path instead of globbing temp_dir later
+            "progress_hooks": [self._progress_hook],
+
             # --- 5. Reliability ---
             "nocheckcertificate": False, 
             "ignoreerrors": True,
             "retries": MAX_RETRIES,
             "fragment_retries": MAX_RETRIES,
+
+            # --- 6. Throughput ---
+            # 1 MiB write buffer instead of the 1 KiB default: ~1000x fewer
+            # Python-level write calls on multi-hundred-MB files, and
+            # noresizebuffer stops the adaptive resizer shrinking it back.
+            "buffersize": 1 << 20,
+            "noresizebuffer": True,
             
-            # --- 6. Output ---
-            "outtmpl": output_path if output_path else str(self.temp_dir / "%(id)s.%(ext)s"),
         }
         return opts
 
-    def _filter_shorts_and_duration(self, info_dict, *, incomplete=False):
-        """
-        Custom filter to reject Shorts and long videos.
+    def _progress_hook(self, d: Dict[str, Any]):
+        """Capture the finished file's path as yt-dlp reports it.
+
+        Thread-local because downloads run in parallel worker threads.
         """
-        duration = info_dict.get('duration')
+        if d.get("status") == "finished" and d.get("filename"):
+            path = Path(d["filename"])
+            self._tls.last_path = path
+            batch = getattr(self._tls, "batch_paths", None)
+            if batch is not None:
+                batch.append(path)
+
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _reject_reason(duration, width, height, is_shorts_url):
+        """Memoized verdict: yt-dlp calls the filter for every format
+        candidate of an extraction, and retries re-run the whole set."""
         if duration and duration > MAX_VIDEO_DURATION_SECONDS:
             return f"Video too long: {duration}s"
-        
-        width = info_dict.get('width')
-        height = info_dict.get('height')
-        url = info_dict.get('webpage_url', '')
 
-        if '/shorts/' in url:
+        if is_shorts_url:
             return "Rejected: Detected as YouTube Short URL"
-        
+
         if width and height and height > width:
             return "Rejected: Vertical video aspect ratio (likely a Short)"
-            
+
         return None
 
-    def _get_video_info(self, url: str) -> Optional[Dict[str, Any]]:
-        try:
+    def _filter_shorts_and_duration(self, info_dict, *, incomplete=False):
+        """
+        Custom filter to reject Shorts and long videos.
+        """
+        return self._reject_reason(
+            info_dict.get('duration'),
+            info_dict.get('width'),
+            info_dict.get('height'),
+            '/shorts/' in info_dict.get('webpage_url', ''),
+        )
+
+    def _get_info_ydl(self) -> yt_dlp.YoutubeDL:
+        """Long-lived metadata extractor for the calling thread."""
+        ydl = getattr(self._tls, "info_ydl", None)
+        if ydl is None:
             ydl_opts = self._get_ydl_options()
             ydl_opts.update({"skip_download": True})
-            
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(url, download=False)
+            ydl = yt_dlp.YoutubeDL(ydl_opts)
+            self._tls.info_ydl = ydl
+        return ydl
+
+    def _get_download_ydl(self) -> yt_dlp.YoutubeDL:
+        """Long-lived downloader for the calling thread.
+
+        download_video always writes to temp_dir with the %(id)s.%(ext)s
+        template, so a single options set covers every call.
+        """
+        ydl = getattr(self._tls, "download_ydl", None)
+        if ydl is None:
+            ydl = yt_dlp.YoutubeDL(
+                self._get_ydl_options(str(self.temp_dir / "%(id)s.%(ext)s"))
+            )
+            self._tls.download_ydl = ydl
+        return ydl
+
+    _INNERTUBE_URL = "https://www.youtube.com/youtubei/v1/player"
+    _INNERTUBE_CLIENT = {"clientName": "ANDROID", "clientVersion": "19.09.37"}
+
+    @staticmethod
+    def _extract_video_id(url: str) -> Optional[str]:
+        parsed = urlparse(url)
+        if parsed.hostname == "youtu.be":
+            return parsed.path.lstrip("/") or None
+        if parsed.query:
+            for part in parsed.query.split("&"):
+                if part.startswith("v="):
+                    return part[2:] or None
+        return None
+
+    def _fast_info(self, video_id: str) -> Optional[Dict[str, Any]]:
+        """Compact metadata via the InnerTube player endpoint.
+
+        One small JSON POST on the shared session instead of yt-dlp's full
+        extraction (watch-page HTML plus JS parsing) - roughly a tenth of
+        the bytes when only the basic fields are needed.
+        """
+        try:
+            resp = SESSION.post(
+                self._INNERTUBE_URL,
+                json={
+                    "context": {"client": self._INNERTUBE_CLIENT},
+                    "videoId": video_id,
+                },
+                timeout=10,
+            )
+            if resp.status_code != 200:
+                return None
+            details = resp.json().get("videoDetails") or {}
+            if not details.get("videoId"):
+                return None
+            thumbs = (details.get("thumbnail") or {}).get("thumbnails") or [{}]
+            author = details.get("author")
+            return {
+                "id": details["videoId"],
+                "title": details.get("title"),
+                "duration": int(details.get("lengthSeconds") or 0) or None,
+                "channel": author,
+                "uploader": author,
+                # Deliberately not "width"/"height": those keys feed the
+                # vertical-video check, and thumbnail geometry must not
+                # masquerade as video geometry there.
+                "thumbnail_width": thumbs[-1].get("width"),
+                "thumbnail_height": thumbs[-1].get("height"),
+                "webpage_url": f"https://www.youtube.com/watch?v={details['videoId']}",
+            }
+        except Exception as e:
+            logger.debug(f"InnerTube probe failed for {video_id}: {e}")
+            return None
+
+    def _get_video_info(self, url: str) -> Optional[Dict[str, Any]]:
+        video_id = self._extract_video_id(url)
+        if video_id:
+            info = self._fast_info(video_id)
+            if info:
                 return info
+        try:
+            return self._get_info_ydl().extract_info(url, download=False)
         except Exception as e:
             logger.error(f"Error getting video info for {url}: {e}")
             return None
 
+    def _find_downloaded_file(self, video_id: str) -> Optional[Path]:
+        """Locate the finished file for a video ID, whatever its container.
+
+        Probes the known extensions directly - a handful of stat calls -
+        instead of enumerating a temp dir that can hold hundreds of
+        in-flight files during a parallel batch. One stat per candidate:
+        a missing file raises instead of costing an exists() check first.
+        """
+        for ext in self._VIDEO_EXTS:
+            path = self.temp_dir / f"{video_id}.{ext}"
+            try:
+                if path.stat().st_size > 0:
+                    return path
+            except OSError:
+                continue
+        return None
+
     def download_with_info(self, url: str) -> Optional[Dict[str, Any]]:
         """
         Downloads video and returns dict with path and info.
         Compatible with Orchestrator expectations.
+
+        Delegates to download_video(return_info=True), which captures the
+        metadata from the same extract_info(download=True) pass as the
+        download itself - no separate probe round-trip.
         """
-        try:
-            # 1. Get info first
-            info = self._get_video_info(url)
-            if not info:
-                return None
-            
-            # 2. Download using the info
-            path = self.download_video(url, pre_fetched_info=info)
-            if not path:
-                return None
-                
-            return {
-                "path": path,
-                "info": info
-            }
-        except Exception as e:
-            logger.error(f"Error in download_with_info for {url}: {e}")
+        result = self.download_video(url, return_info=True)
+        if not result:
             return None
+        path, info = result
+        if not path or not info:
+            return None
+        return {
+            "path": path,
+            "info": info
+        }
 
     def download_video(
         self,
         url: str,
         filename: Optional[str] = None,
-        pre_fetched_info: Optional[Dict[str, Any]] = None
-    ) -> Optional[Path]:
+        pre_fetched_info: Optional[Dict[str, Any]] = None,
+        return_info: bool = False,
+    ):
+        """Download one URL; with return_info=True, returns (path, info)
+        where info comes from the download pass itself."""
         try:
             # Use pre-fetched info if available to save a request
             video_info = pre_fetched_info
@@ -158,21 +362,31 @@ class VideoDownloader:
             if filename is None:
                 filename = f"{video_id}.mp4"
             output_path = self.temp_dir / filename
-            output_template = str(self.temp_dir / f"{video_id}.%(ext)s")
 
             if output_path.exists() and output_path.stat().st_size > 0:
                 logger.info(f"Skipping download, file exists: {output_path}")
-                return output_path
+                return (output_path, video_info) if return_info else output_path
 
             logger.info(f"Downloading (Flexible Format): {url} -> {output_path}")
             
-            ydl_opts = self._get_ydl_options(output_template)
-            
+            host = urlparse(url).hostname
+            self._tls.last_path = None
+            # One instance for the whole retry loop: the extractor setup is
+            # paid once and its warm connections survive across attempts.
+            ydl = self._get_download_ydl()
+            info_out = None
             attempts = 0
             while attempts <= MAX_RETRIES:
                 try:
-                    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                        ydl.download([url])
+                    # The reused instance keeps state between attempts;
+                    # clear the retcode so an earlier failure can't mask
+                    # a later success.
+                    ydl._download_retcode = 0
+                    with self._limiter.acquire(host):
+                        # download=True returns the full info dict from the
+                        # same pass, so callers wanting metadata don't pay
+                        # a second extraction
+                        info_out = ydl.extract_info(url, download=True)
                     break 
                 except Exception as e:
                     attempts += 1
@@ -181,6 +395,7 @@ class VideoDownloader:
                     if "429" in error_str or "too many requests" in error_str:
                         delay = min(BACKOFF_MAX_DELAY, BACKOFF_BASE_DELAY * (BACKOFF_FACTOR ** attempts))
                         logger.warning(f"🛑 Rate Limited (429). Cooling down for {delay}s...")
+                        self._limiter.backoff(host, delay)
                         time.sleep(delay)
                     elif "sign in" in error_str:
                         logger.error("🛑 Authentication failed! Check your cookies.txt file expiration.")
@@ -193,25 +408,71 @@ class VideoDownloader:
                         logger.warning(f"Retry ({attempts}): {e}")
                         time.sleep(delay)
 
-            # Robust file finder: Look for ANY extension
-            candidates = list(self.temp_dir.glob(f"{video_id}.*"))
-            # Filter out non-video files just in case (like .json or .part)
-            valid_candidates = [
-                p for p in candidates 
-                if p.stat().st_size > 0 and p.suffix.lower() in ['.mp4', '.webm', '.mkv', '.flv', '.avi', '.mov']
-            ]
-            
-            if valid_candidates:
-                # Mimic human "watching" time
-                time.sleep(random.uniform(DOWNLOAD_DELAY_MIN, DOWNLOAD_DELAY_MAX))
-                return valid_candidates[0]
-            else:
-                return None
+            # Path from the download pass, the progress hook, or a probe
+            path = None
+            requested = (info_out or {}).get("requested_downloads") or []
+            if requested and requested[0].get("filepath"):
+                path = Path(requested[0]["filepath"])
+            if path is None or not path.exists():
+                path = getattr(self._tls, "last_path", None)
+            if (path is None or not path.exists() or path.stat().st_size == 0):
+                path = self._find_downloaded_file(video_id)
+            if return_info:
+                return (path, info_out or video_info) if path else None
+            return path
 
         except Exception as e:
             logger.error(f"Critical error downloading {url}: {e}")
             return None
 
+    def download_batch(self, urls: List[str]) -> List[Path]:
+        """Download several URLs inside one yt-dlp call.
+
+        ydl.download() accepts a list and works through it in a single
+        context, amortizing per-call setup and reusing its HTTP pool; the
+        progress hook collects the realized paths as each finishes.
+        """
+        if not urls:
+            return []
+        self._tls.batch_paths = []
+        try:
+            self._get_download_ydl().download(urls)
+        except Exception as e:
+            logger.error(f"Batch download error: {e}")
+        finally:
+            paths = self._tls.batch_paths
+            self._tls.batch_paths = None
+        return [p for p in paths if p.exists() and p.stat().st_size > 0]
+
+    async def _download_many_async(self, urls: List[str], limit: int) -> List[Path]:
+        """Partition the URLs into host-capped batches downloaded concurrently.
+
+        yt-dlp itself stays in charge of the transfer (it merges separate
+        video+audio formats, handles fragments and retries); each batch
+        runs via asyncio.to_thread. URLs are grouped by host first and
+        each host gets at most 4 concurrent batches, so a batch dominated
+        by one host can't fire `limit` simultaneous connections at it and
+        trigger a 429 storm; the overall semaphore still bounds total
+        concurrency.
+        """
+        by_host: Dict[str, List[str]] = {}
+        for url in urls:
+            by_host.setdefault(urlparse(url).hostname or "_default", []).append(url)
+
+        groups: List[List[str]] = []
+        for host_urls in by_host.values():
+            splits = max(1, min(4, limit, len(host_urls)))
+            groups.extend(host_urls[i::splits] for i in range(splits))
+
+        sem = asyncio.Semaphore(limit)
+
+        async def run(group: List[str]) -> List[Path]:
+            async with sem:
+                return await asyncio.to_thread(self.download_batch, group)
+
+        results = await asyncio.gather(*(run(group) for group in groups))
+        return [path for group in results for path in group]
+
     def download_videos_parallel(
         self,
         urls: List[str],
@@ -221,24 +482,22 @@ class VideoDownloader:
         if max_videos:
             urls = urls[:max_videos]
 
-        downloaded_files = []
         logger.info(f"Starting parallel download of {len(urls)} videos using Cookies...")
-        
-        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-            future_to_url = {executor.submit(self.download_video, url): url for url in urls}
-            
-            for future in concurrent.futures.as_completed(future_to_url):
-                path = future.result()
-                if path:
-                    downloaded_files.append(path)
-
-        return downloaded_files
+        return asyncio.run(self._download_many_async(urls, max_workers))
 
     def cleanup_temp_files(self):
+        # os.scandir gets the file-type bit from the directory read
+        # itself, so the sweep is one getdents pass plus one unlink per
+        # file instead of a stat per glob entry.
         try:
-            files = list(self.temp_dir.glob("*"))
-            for file in files:
-                if file.is_file():
-                    file.unlink()
-        except Exception as e:
-            logger.error(f"Error cleaning up temp files: {e}")
\ No newline at end of file
+            entries = os.scandir(self.temp_dir)
+        except OSError as e:
+            logger.error(f"Error cleaning up temp files: {e}")
+            return
+        with entries:
+            for entry in entries:
+                try:
+                    if entry.is_file():
+                        os.unlink(entry.path)
+                except OSError as e:
+                    logger.error(f"Error removing temp file {entry.path}: {e}")
\ No newline at end of file
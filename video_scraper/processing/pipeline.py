@@ -0,0 +1,74 @@
+import asyncio
+import os
+from pathlib import Path
+from typing import List, Optional
+
+from video_scraper.config import MAX_CONCURRENT_DOWNLOADS
+from video_scraper.utils import logger
+from .downloader import VideoDownloader
+from .video_processor import VideoProcessor
+
+
+def download_and_process(
+    urls: List[str],
+    downloader: Optional[VideoDownloader] = None,
+    processor: Optional[VideoProcessor] = None,
+    max_concurrent: int = MAX_CONCURRENT_DOWNLOADS,
+    delete_originals: bool = True,
+) -> List[Path]:
+    """Download and encode a batch of URLs as one overlapped pipeline.
+
+    Running download_videos_parallel and then process_videos leaves the
+    CPU idle during the download phase and the network idle during the
+    encode phase. Here downloaders hand finished files to encoders
+    through a bounded queue, so both stages run at once; the queue's
+    maxsize also caps how many downloaded-but-unencoded files pile up
+    in temp_dir.
+    """
+    downloader = downloader or VideoDownloader()
+    processor = processor or VideoProcessor()
+    return asyncio.run(
+        _pipeline(urls, downloader, processor, max_concurrent, delete_originals)
+    )
+
+
+async def _pipeline(
+    urls: List[str],
+    downloader: VideoDownloader,
+    processor: VideoProcessor,
+    max_concurrent: int,
+    delete_originals: bool,
+) -> List[Path]:
+    queue: asyncio.Queue = asyncio.Queue(maxsize=2 * max_concurrent)
+    processed: List[Path] = []
+    sem = asyncio.Semaphore(max_concurrent)
+
+    async def produce(url: str):
+        async with sem:
+            path = await asyncio.to_thread(downloader.download_video, url)
+        if path:
+            await queue.put(path)
+
+    async def consume():
+        while True:
+            path = await queue.get()
+            try:
+                out = await asyncio.to_thread(
+                    processor.process_video, path, None, delete_originals
+                )
+                if out:
+                    processed.append(out)
+            finally:
+                queue.task_done()
+
+    consumers = [
+        asyncio.create_task(consume())
+        for _ in range(max(1, (os.cpu_count() or 2) // 2))
+    ]
+    await asyncio.gather(*(produce(url) for url in urls))
+    await queue.join()
+    for consumer in consumers:
+        consumer.cancel()
+
+    logger.info(f"Pipeline processed {len(processed)}/{len(urls)} videos")
+    return processed
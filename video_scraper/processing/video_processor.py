@@ -1,15 +1,97 @@
+import os
 import subprocess
 import json
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
 from pathlib import Path
 from typing import Optional
 from video_scraper.config import PROCESSED_DIR, VIDEO_WIDTH, VIDEO_HEIGHT
 from video_scraper.utils import logger
 
+try:
+    # Optional: in-process libav bindings; the ffmpeg CLI remains the
+    # fallback (and the only path for NVENC) when PyAV is absent.
+    import av
+except ImportError:
+    av = None
+
+
+@lru_cache(maxsize=None)
+def _nvenc_available() -> bool:
+    """Probe once per process whether ffmpeg can encode with NVENC.
+
+    Actually encodes one frame through the CUDA filter chain rather than
+    grepping `-encoders`: the encoder list only shows what was compiled
+    in, which passes on GPU-less hosts, and scale_cuda/pad_cuda are
+    missing from older ffmpeg builds even with a working GPU.
+    """
+    try:
+        result = subprocess.run(
+            [
+                "ffmpeg", "-hide_banner",
+                "-f", "lavfi", "-i", "color=black:s=64x64",
+                "-frames:v", "1",
+                "-vf", "hwupload_cuda,scale_cuda=64:64,pad_cuda=64:64",
+                "-c:v", "h264_nvenc",
+                "-f", "null", "-",
+            ],
+            capture_output=True,
+            timeout=30,
+        )
+        return result.returncode == 0
+    except Exception:
+        return False
+
 
 class VideoProcessor:
     def __init__(self):
         self.processed_dir = PROCESSED_DIR
         self.processed_dir.mkdir(parents=True, exist_ok=True)
+        self.use_nvenc = _nvenc_available()
+        if self.use_nvenc:
+            logger.info("NVENC available: encoding on GPU")
+
+        # The command only varies in its input/output paths, so the static
+        # pieces are assembled once per processor. The CPU variant is
+        # always built: it is the active path without NVENC and the
+        # runtime fallback when an NVENC invocation fails anyway.
+        self._cpu_head = ("ffmpeg", "-i")
+        self._cpu_vf = (
+            f"scale={VIDEO_WIDTH}:{VIDEO_HEIGHT}:force_original_aspect_ratio=decrease,"
+            f"pad={VIDEO_WIDTH}:{VIDEO_HEIGHT}:(ow-iw)/2:(oh-ih)/2:black"
+        )
+        self._cpu_tail = (
+            "-c:v", "libx264",
+            "-preset", "medium",
+            "-crf", "23",
+            # Capped so parallel encodes don't oversubscribe cores
+            "-threads", "2",
+            "-c:a", "aac",
+            "-b:a", "128k",
+            "-movflags", "+faststart",
+            "-y",
+        )
+        if self.use_nvenc:
+            self._cmd_head = ("ffmpeg", "-hwaccel", "cuda", "-hwaccel_output_format", "cuda", "-i")
+            self._vf = (
+                f"scale_cuda={VIDEO_WIDTH}:{VIDEO_HEIGHT}:force_original_aspect_ratio=decrease,"
+                f"pad_cuda={VIDEO_WIDTH}:{VIDEO_HEIGHT}:(ow-iw)/2:(oh-ih)/2"
+            )
+            self._cmd_tail = (
+                "-c:v", "h264_nvenc",
+                "-preset", "p4",
+                "-rc", "vbr",
+                "-cq", "23",
+                "-b:v", "0",
+                "-c:a", "aac",
+                "-b:a", "128k",
+                "-movflags", "+faststart",
+                "-y",
+            )
+        else:
+            self._cmd_head = self._cpu_head
+            self._vf = self._cpu_vf
+            self._cmd_tail = self._cpu_tail
 
     def _get_output_path(self, input_path: Path) -> Path:
         output_filename = f"{input_path.stem}_processed{input_path.suffix}"
@@ -31,19 +113,26 @@ class VideoProcessor:
 
             logger.info(f"Processing video: {input_path} -> {output_path}")
 
-            cmd = [
-                "ffmpeg",
-                "-i", str(input_path),
-                "-vf", f"scale={VIDEO_WIDTH}:{VIDEO_HEIGHT}:force_original_aspect_ratio=decrease,pad={VIDEO_WIDTH}:{VIDEO_HEIGHT}:(ow-iw)/2:(oh-ih)/2:black",
-                "-c:v", "libx264",
-                "-preset", "medium",
-                "-crf", "23",
-                "-c:a", "aac",
-                "-b:a", "128k",
-                "-movflags", "+faststart",
-                "-y",
-                str(output_path),
-            ]
+            # In-process decode/scale/encode when PyAV is available: no
+            # fork/exec or libavcodec re-init per file. NVENC stays on the
+            # CLI path where the hwaccel plumbing already works.
+            if av is not None and not self.use_nvenc:
+                try:
+                    self._process_with_pyav(input_path, output_path)
+                except Exception as e:
+                    logger.warning(f"PyAV processing failed ({e}); falling back to ffmpeg CLI")
+                else:
+                    if output_path.exists() and output_path.stat().st_size > 0:
+                        logger.info(f"Successfully processed video: {output_path}")
+                        if delete_original:
+                            try:
+                                input_path.unlink()
+                                logger.info(f"Deleted original file: {input_path}")
+                            except Exception as e:
+                                logger.warning(f"Could not delete original file: {e}")
+                        return output_path
+
+            cmd = (*self._cmd_head, str(input_path), "-vf", self._vf, *self._cmd_tail, str(output_path))
 
             result = subprocess.run(
                 cmd,
@@ -54,6 +143,27 @@ class VideoProcessor:
                 timeout=300,
             )
 
+            if result.returncode != 0 and self.use_nvenc:
+                # The probe can still be wrong at runtime (GPU busy,
+                # driver mismatch); demote this processor to the CPU
+                # command rather than failing every video.
+                logger.warning(
+                    f"NVENC encode failed for {input_path}; falling back to libx264: {result.stderr}"
+                )
+                self.use_nvenc = False
+                self._cmd_head = self._cpu_head
+                self._vf = self._cpu_vf
+                self._cmd_tail = self._cpu_tail
+                cmd = (*self._cmd_head, str(input_path), "-vf", self._vf, *self._cmd_tail, str(output_path))
+                result = subprocess.run(
+                    cmd,
+                    capture_output=True,
+                    text=True,
+                    encoding="utf-8",
+                    errors="replace",
+                    timeout=300,
+                )
+
             if result.returncode != 0:
                 logger.error(f"FFmpeg error: {result.stderr}")
                 return None
@@ -80,22 +190,110 @@ class VideoProcessor:
             logger.error(f"Error processing video: {e}")
             return None
 
+    def _process_with_pyav(self, input_path: Path, output_path: Path):
+        """Scale/pad/encode through libav directly, audio re-encoded to AAC."""
+        with av.open(str(input_path)) as in_container, \
+                av.open(str(output_path), "w") as out_container:
+            vin = in_container.streams.video[0]
+            ain = in_container.streams.audio[0] if in_container.streams.audio else None
+
+            vout = out_container.add_stream("libx264", rate=vin.average_rate or 30)
+            vout.width = VIDEO_WIDTH
+            vout.height = VIDEO_HEIGHT
+            vout.pix_fmt = "yuv420p"
+            vout.options = {"preset": "medium", "crf": "23"}
+            aout = None
+            if ain is not None:
+                aout = out_container.add_stream("aac", rate=ain.rate or 44100)
+                aout.bit_rate = 128_000
+
+            # Same filter chain the CLI path uses
+            graph = av.filter.Graph()
+            src = graph.add_buffer(template=vin)
+            scale = graph.add(
+                "scale",
+                f"{VIDEO_WIDTH}:{VIDEO_HEIGHT}:force_original_aspect_ratio=decrease",
+            )
+            pad = graph.add(
+                "pad",
+                f"{VIDEO_WIDTH}:{VIDEO_HEIGHT}:(ow-iw)/2:(oh-ih)/2:black",
+            )
+            sink = graph.add("buffersink")
+            src.link_to(scale)
+            scale.link_to(pad)
+            pad.link_to(sink)
+            graph.configure()
+
+            def drain_graph():
+                while True:
+                    try:
+                        filtered = graph.pull()
+                    except (av.error.BlockingIOError, av.error.EOFError):
+                        return
+                    for packet in vout.encode(filtered):
+                        out_container.mux(packet)
+
+            streams = [s for s in (vin, ain) if s is not None]
+            for packet in in_container.demux(streams):
+                if packet.dts is None:
+                    continue
+                if packet.stream is vin:
+                    for frame in packet.decode():
+                        graph.push(frame)
+                        drain_graph()
+                elif aout is not None:
+                    for frame in packet.decode():
+                        for out_packet in aout.encode(frame):
+                            out_container.mux(out_packet)
+
+            # Flush the filter graph and both encoders
+            graph.push(None)
+            drain_graph()
+            for packet in vout.encode():
+                out_container.mux(packet)
+            if aout is not None:
+                for packet in aout.encode():
+                    out_container.mux(packet)
+
     def process_videos(
         self,
         input_paths: list[Path],
         delete_originals: bool = True,
     ) -> list[Path]:
-        processed_files = []
-        
-        for input_path in input_paths:
-            output_path = self.process_video(input_path, delete_original=delete_originals)
-            if output_path:
-                processed_files.append(output_path)
+        if not input_paths:
+            return []
+
+        # Each ffmpeg is capped at 2 threads, so run up to cpu_count//2
+        # encodes side by side instead of one at a time.
+        max_workers = min(len(input_paths), max(1, (os.cpu_count() or 2) // 2))
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(
+                partial(process_video_file, delete_original=delete_originals),
+                [str(p) for p in input_paths],
+            ))
+        processed_files = [path for path in results if path]
         
         logger.info(f"Successfully processed {len(processed_files)}/{len(input_paths)} videos")
         return processed_files
 
     def get_video_info(self, video_path: Path) -> Optional[dict]:
+        # Read the header through libav directly when PyAV is available:
+        # sub-ms instead of an ffprobe fork+exec plus JSON round-trip.
+        if av is not None:
+            try:
+                with av.open(str(video_path)) as container:
+                    stream = container.streams.video[0]
+                    duration = None
+                    if stream.duration is not None:
+                        duration = float(stream.duration * stream.time_base)
+                    return {
+                        "width": stream.width,
+                        "height": stream.height,
+                        "duration": duration,
+                    }
+            except Exception as e:
+                logger.warning(f"PyAV probe failed for {video_path}: {e}")
+
         try:
             cmd = [
                 "ffprobe",
@@ -122,3 +320,18 @@ class VideoProcessor:
         except Exception as e:
             logger.error(f"Error getting video info: {e}")
             return None
+
+
+def process_video_file(
+    input_path: Path,
+    output_path: Optional[Path] = None,
+    delete_original: bool = True,
+) -> Optional[Path]:
+    """Module-level entry point so process pools can run the ffmpeg stage
+    in worker processes without pickling an orchestrator-held instance.
+    Accepts plain strings for both paths (cheaper to pickle)."""
+    return VideoProcessor().process_video(
+        Path(input_path),
+        output_path=Path(output_path) if output_path is not None else None,
+        delete_original=delete_original,
+    )
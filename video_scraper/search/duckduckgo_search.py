@@ -1,51 +1,82 @@
+import logging
 import re
 import time
 import random
 from typing import List, Optional, Set, Any, Dict
 from duckduckgo_search import DDGS
-from urllib.parse import urlparse
 from video_scraper.config import USER_AGENTS, SEARCH_DELAY_MIN, SEARCH_DELAY_MAX, MAX_RETRIES, SEARCH_FETCH_LIMIT
 from video_scraper.utils import logger
 
+try:
+    from duckduckgo_search.exceptions import DuckDuckGoSearchException
+except ImportError:  # older duckduckgo_search releases
+    DuckDuckGoSearchException = Exception
+
+# Transient failures worth retrying: network/timeout errors (requests
+# exceptions subclass OSError) and the library's own rate-limit/timeout
+# exceptions. Anything else (bad arguments, bugs) propagates immediately.
+_RETRYABLE_EXCEPTIONS = (OSError, DuckDuckGoSearchException)
+
 
 class YouTubeSearcher:
+    """Searches DuckDuckGo for YouTube videos.
+
+    existing_urls holds bare 11-character video IDs, not full URLs, so
+    dedupe is insensitive to URL form (watch/embed/shorts/youtu.be).
+    Full URLs passed to the constructor or update_existing_urls are
+    converted on the way in.
+    """
+
+    # One fused pattern covering watch/embed/shorts/youtu.be forms,
+    # compiled once at class load instead of per call per candidate URL
+    _VIDEO_ID_RE = re.compile(
+        r'(?:youtube\.com/(?:watch\?v=|embed/|shorts/)|youtu\.be/)([a-zA-Z0-9_-]{11})'
+    )
+
     def __init__(self, existing_urls: Optional[Set[str]] = None, db_manager: Any = None):
-        self.existing_urls = existing_urls or set()
+        self.existing_urls = self._to_video_ids(existing_urls or set())
         self.request_count = 0
         self.db_manager = db_manager
         self.region = "wt-wt"
         self.safesearch = "moderate"
+        # Memoized search results keyed on (query, max_results);
+        # generated queries recur across subtopics and each repeat would
+        # otherwise cost a full network round-trip.
+        self._query_cache: Dict[tuple, List[str]] = {}
+        # One DDGS session for the searcher's lifetime: keeps the
+        # underlying connection pool warm instead of paying the TCP/TLS
+        # handshake again on every query.
+        self._ddgs = DDGS()
 
-    def _extract_video_id(self, url: str) -> Optional[str]:
-        patterns = [
-            r'(?:youtube\.com\/watch\?v=|youtu\.be\/|youtube\.com\/embed\/)([a-zA-Z0-9_-]{11})',
-            r'youtube\.com\/shorts\/([a-zA-Z0-9_-]{11})',
-        ]
-        for pattern in patterns:
-            match = re.search(pattern, url)
+    def close(self):
+        if self._ddgs is not None:
+            try:
+                self._ddgs.__exit__(None, None, None)
+            except Exception:
+                pass
+            self._ddgs = None
+
+    def __enter__(self) -> "YouTubeSearcher":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __del__(self):
+        self.close()
+
+    @classmethod
+    def _to_video_ids(cls, urls: Set[str]) -> Set[str]:
+        ids = set()
+        for url in urls:
+            match = cls._VIDEO_ID_RE.search(url)
             if match:
-                return match.group(1)
-        return None
-
-    def _is_valid_youtube_url(self, url: str) -> bool:
-        return bool(self._extract_video_id(url))
-
-    def _is_youtube_domain(self, url: str) -> bool:
-        try:
-            parsed = urlparse(url)
-            host = (parsed.netloc or "").lower()
-            return "youtube.com" in host
-        except Exception:
-            return False
-
-    def _is_shorts_url(self, url: str) -> bool:
-        return "/shorts/" in url.lower()
-
-    def _normalize_url(self, url: str) -> str:
-        video_id = self._extract_video_id(url)
-        if video_id:
-            return f"https://www.youtube.com/watch?v={video_id}"
-        return url
+                ids.add(match.group(1))
+        return ids
+
+    def _extract_video_id(self, url: str) -> Optional[str]:
+        match = self._VIDEO_ID_RE.search(url)
+        return match.group(1) if match else None
 
     def _extract_result_url(self, result: Dict[str, Any]) -> Optional[str]:
         url = result.get("content") or result.get("embed_url") or result.get("url")
@@ -54,20 +85,28 @@ class YouTubeSearcher:
     def _parse_duration_seconds(self, duration_str: Optional[str]) -> Optional[int]:
         if not duration_str or not isinstance(duration_str, str):
             return None
-        try:
-            parts = duration_str.strip().split(":")
-            parts = [int(p) for p in parts]
-            if len(parts) == 3:
-                h, m, s = parts
-                return h * 3600 + m * 60 + s
-            if len(parts) == 2:
-                m, s = parts
-                return m * 60 + s
-            if len(parts) == 1:
-                return parts[0]
-        except Exception:
+        # Single left-to-right pass: each ':' promotes the accumulated
+        # field by a factor of 60, so H:MM:SS, M:SS and plain seconds all
+        # fall out without splitting into intermediate lists. More than
+        # two colons or a digit-free string is rejected, matching the
+        # split-based parser this replaced.
+        total = cur = colons = 0
+        saw_digit = False
+        for ch in duration_str:
+            if ch == ":":
+                colons += 1
+                if colons > 2:
+                    return None
+                total = total * 60 + cur
+                cur = 0
+            elif "0" <= ch <= "9":
+                saw_digit = True
+                cur = cur * 10 + (ord(ch) - 48)
+            elif ch != " ":
+                return None
+        if not saw_digit:
             return None
-        return None
+        return total * 60 + cur
 
     def search_videos(
         self,
@@ -81,42 +120,44 @@ class YouTubeSearcher:
         require_youtube_domain: bool = True,
     ) -> List[str]:
         retries = 0
+        prev_sleep = SEARCH_DELAY_MIN
         while retries <= MAX_RETRIES:
             try:
                 self.request_count += 1
                 logger.info(f"Searching for: {query}")
 
                 fetch_count = min(SEARCH_FETCH_LIMIT, max_results * 5)
-                with DDGS() as ddgs:
-                    results = list(
-                        ddgs.videos(
-                            query,
-                            max_results=fetch_count,
-                            region=self.region,
-                            safesearch=self.safesearch,
-                        )
+                results = list(
+                    self._ddgs.videos(
+                        query,
+                        max_results=fetch_count,
+                        region=self.region,
+                        safesearch=self.safesearch,
                     )
+                )
 
                 video_urls = []
                 for result in results:
+                    # Checks ordered cheapest-first so non-YouTube
+                    # results fall out before the regex ever runs.
                     url = self._extract_result_url(result) or ""
                     if not url:
                         continue
-                    if require_youtube_domain and not self._is_youtube_domain(url):
+                    if exclude_shorts and "/shorts/" in url:
+                        continue
+                    match = self._VIDEO_ID_RE.search(url)
+                    if not match:
                         continue
-                    if exclude_shorts and self._is_shorts_url(url):
+                    video_id = match.group(1)
+                    if exclude_existing and video_id in self.existing_urls:
+                        if logger.isEnabledFor(logging.DEBUG):
+                            logger.debug(f"Skipping existing video: {video_id}")
                         continue
-                    if self._is_valid_youtube_url(url):
-                        normalized_url = self._normalize_url(url)
-                        
-                        if exclude_existing and normalized_url in self.existing_urls:
-                            logger.debug(f"Skipping existing URL: {normalized_url}")
+                    if max_duration_seconds is not None:
+                        d = self._parse_duration_seconds(result.get("duration"))
+                        if d is not None and d > max_duration_seconds:
                             continue
-                        if max_duration_seconds is not None:
-                            d = self._parse_duration_seconds(result.get("duration"))
-                            if d is not None and d > max_duration_seconds:
-                                continue
-                        video_urls.append(normalized_url)
+                    video_urls.append(f"https://www.youtube.com/watch?v={video_id}")
 
                 logger.info(f"Found {len(video_urls)} new videos for query: {query}")
                 
@@ -135,17 +176,21 @@ class YouTubeSearcher:
                 
                 return video_urls
 
-            except Exception as e:
+            except _RETRYABLE_EXCEPTIONS as e:
                 retries += 1
                 logger.warning(f"Error searching for videos (Attempt {retries}/{MAX_RETRIES + 1}): {e}")
-                
+
                 if retries <= MAX_RETRIES:
-                    sleep_time = random.uniform(SEARCH_DELAY_MIN, SEARCH_DELAY_MAX) * (2 ** retries)
+                    # Decorrelated jitter with a hard cap: grows from the
+                    # previous sleep rather than 2**retries, so the tail
+                    # is bounded at 60s instead of minutes.
+                    sleep_time = min(60.0, random.uniform(SEARCH_DELAY_MIN, prev_sleep * 3))
+                    prev_sleep = sleep_time
                     logger.info(f"Waiting {sleep_time:.2f}s before retry...")
                     time.sleep(sleep_time)
                 else:
                     logger.error(f"Max retries reached for query: {query}")
-                    raise e
+                    raise
         return []
 
     def search_videos_for_topic(
@@ -154,12 +199,16 @@ class YouTubeSearcher:
         subtopics: List[str],
         max_results_per_subtopic: int = 3,
     ) -> List[str]:
-        all_urls = []
-        
+        # Dedup streams through `seen` as results arrive, so all_urls
+        # never holds duplicates and no final rebuild pass is needed.
+        all_urls: List[str] = []
+        seen: Set[str] = set()
+        cap = max_results_per_subtopic * len(subtopics)
+
         for subtopic in subtopics:
-            if self.existing_urls and len(all_urls) >= max_results_per_subtopic * len(subtopics):
+            if self.existing_urls and len(all_urls) >= cap:
                 break
-            
+
             queries = [
                 f"{topic} {subtopic}",
                 f"{subtopic} tutorial",
@@ -170,21 +219,35 @@ class YouTubeSearcher:
             for q in queries:
                 if len(collected) >= max_results_per_subtopic:
                     break
+                # Stop dispatching as soon as the global quota is met;
+                # without this a final subtopic could still fire up to
+                # three more searches whose results would be discarded.
+                if len(all_urls) + len(collected) >= cap:
+                    break
+                need = min(10, max_results_per_subtopic - len(collected))
+                # Repeats within this traversal (e.g. the same
+                # "<subtopic> tutorial" generated for two topics) are
+                # served from memory instead of re-dispatched.
+                key = (q, need)
+                if key in self._query_cache:
+                    collected.extend(self._query_cache[key])
+                    continue
                 urls = self.search_videos(
                     q,
-                    max_results=min(10, max_results_per_subtopic - len(collected)),
+                    max_results=need,
                     topic=topic,
                     subtopic=subtopic,
                 )
+                self._query_cache[key] = urls
                 collected.extend(urls)
-                time.sleep(2)
-            urls = collected
-            all_urls.extend(urls)
-        
-        unique_urls = list(dict.fromkeys(all_urls))
-        logger.info(f"Total unique videos found for topic '{topic}': {len(unique_urls)}")
-        
-        return unique_urls
+            for u in collected:
+                if u not in seen:
+                    seen.add(u)
+                    all_urls.append(u)
+
+        logger.info(f"Total unique videos found for topic '{topic}': {len(all_urls)}")
+
+        return all_urls
     
     def search_videos_for_subtopic(self, topic: str, subtopic: str, max_results: int = 10) -> List[str]:
         queries = [
@@ -217,5 +280,5 @@ class YouTubeSearcher:
         return collected
 
     def update_existing_urls(self, new_urls: Set[str]):
-        self.existing_urls.update(new_urls)
-        logger.debug(f"Updated existing URLs cache. Total: {len(self.existing_urls)}")
+        self.existing_urls.update(self._to_video_ids(new_urls))
+        logger.debug(f"Updated existing video-ID cache. Total: {len(self.existing_urls)}")
@@ -1,5 +1,7 @@
 from .logger import logger, setup_logger
+from .http import SESSION
+from .checkpoint import save_checkpoint, load_checkpoint
 from .state_manager import StateManager
 from .json_parser import JSONParser
 
-__all__ = ["logger", "setup_logger", "StateManager", "JSONParser"]
+__all__ = ["logger", "setup_logger", "SESSION", "save_checkpoint", "load_checkpoint", "StateManager", "JSONParser"]
@@ -0,0 +1,33 @@
+import os
+import orjson
+from pathlib import Path
+from typing import Any, Dict, Optional
+from video_scraper.utils.logger import logger
+
+
+def save_checkpoint(path: Path, state: Dict[str, Any]) -> bool:
+    """Write checkpoint state atomically: tmp file + os.replace.
+
+    A crash mid-write leaves the previous checkpoint intact instead of a
+    truncated file that breaks resume.
+    """
+    tmp = path.with_suffix(".tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp.write_bytes(orjson.dumps(state))
+        os.replace(tmp, path)
+        return True
+    except Exception as e:
+        logger.error(f"Error saving checkpoint {path}: {e}")
+        return False
+
+
+def load_checkpoint(path: Path) -> Optional[Dict[str, Any]]:
+    """Load a checkpoint written by save_checkpoint, or None if absent/corrupt."""
+    if not path.exists():
+        return None
+    try:
+        return orjson.loads(path.read_bytes())
+    except Exception as e:
+        logger.error(f"Error loading checkpoint {path}: {e}")
+        return None
@@ -0,0 +1,26 @@
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from video_scraper.config import (
+    CONNECTION_POOL_SIZE,
+    MAX_RETRIES,
+    BACKOFF_FACTOR,
+    get_random_user_agent,
+)
+
+# Module-level singleton session: reusing one session keeps TCP+TLS
+# connections alive across calls instead of handshaking per request.
+SESSION = requests.Session()
+
+_adapter = HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=CONNECTION_POOL_SIZE,
+    max_retries=Retry(
+        total=MAX_RETRIES,
+        backoff_factor=BACKOFF_FACTOR,
+        status_forcelist=[429, 500, 502, 503, 504],
+    ),
+)
+SESSION.mount("https://", _adapter)
+SESSION.mount("http://", _adapter)
+SESSION.headers["User-Agent"] = get_random_user_agent()
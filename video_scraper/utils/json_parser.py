@@ -1,8 +1,15 @@
-import json
+import orjson
 from pathlib import Path
-from typing import Dict, List, Any, Iterator, Union
+from typing import Dict, Iterator, List, Any, Union
 from video_scraper.utils import logger
 
+try:
+    # Optional: streaming parser for iter_topics; the eager orjson path
+    # remains the fallback when ijson is absent.
+    import ijson
+except ImportError:
+    ijson = None
+
 
 class JSONParser:
     def __init__(self, json_path: Union[str, Path]):
@@ -10,13 +17,22 @@ class JSONParser:
         if not self.json_path.exists():
             raise FileNotFoundError(f"JSON file not found: {self.json_path}")
         
-        self.data = self._load_json()
         self.subject = self.json_path.stem
+        self._data: Union[Dict[str, Any], None] = None
+        self._all_topics: Union[List[Dict[str, Any]], None] = None
+        self._subtopic_count: Union[int, None] = None
+
+    @property
+    def data(self) -> Dict[str, Any]:
+        # Loaded lazily so a parser used only through iter_topics never
+        # materializes the whole file.
+        if self._data is None:
+            self._data = self._load_json()
+        return self._data
 
     def _load_json(self) -> Dict[str, Any]:
         try:
-            with open(self.json_path, "r", encoding="utf-8") as f:
-                return json.load(f)
+            return orjson.loads(self.json_path.read_bytes())
         except Exception as e:
             logger.error(f"Error loading JSON file: {e}")
             raise
@@ -27,14 +43,42 @@ class JSONParser:
     def get_topics_for_class_range(self, class_range: str) -> List[Dict[str, Any]]:
         return self.data.get(class_range, [])
 
-    def get_all_topics(self) -> Iterator[Dict[str, Any]]:
-        for class_range in self.get_class_ranges():
-            for topic_data in self.get_topics_for_class_range(class_range):
-                yield {
+    def get_all_topics(self) -> List[Dict[str, Any]]:
+        # Built once and cached; callers iterate this list many times per run
+        if self._all_topics is None:
+            self._all_topics = [
+                {
                     "class_range": class_range,
                     "subject": self.subject,
                     **topic_data,
                 }
+                for class_range in self.get_class_ranges()
+                for topic_data in self.get_topics_for_class_range(class_range)
+            ]
+        return self._all_topics
+
+    def iter_topics(self) -> Iterator[Dict[str, Any]]:
+        """Stream merged topic records without holding the whole file.
+
+        Yields the same records as get_all_topics, but parses the subject
+        file incrementally with ijson so the first topic is available
+        before the full curriculum is in memory. Single-pass consumers
+        should prefer this; repeat iterators should use get_all_topics,
+        which caches. Falls back to the eager path when ijson is not
+        installed.
+        """
+        if self._all_topics is not None or ijson is None:
+            yield from self.get_all_topics()
+            return
+
+        with open(self.json_path, "rb") as f:
+            for class_range, topic_list in ijson.kvitems(f, ""):
+                for topic_data in topic_list:
+                    yield {
+                        "class_range": class_range,
+                        "subject": self.subject,
+                        **topic_data,
+                    }
 
     def get_total_topic_count(self) -> int:
         count = 0
@@ -43,10 +87,11 @@ class JSONParser:
         return count
 
     def get_total_subtopic_count(self) -> int:
-        count = 0
-        for topic in self.get_all_topics():
-            count += len(topic.get("subtopics", []))
-        return count
+        if self._subtopic_count is None:
+            self._subtopic_count = sum(
+                len(topic.get("subtopics", [])) for topic in self.get_all_topics()
+            )
+        return self._subtopic_count
 
     def get_summary(self) -> Dict[str, Any]:
         return {
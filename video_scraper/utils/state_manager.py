@@ -1,21 +1,46 @@
-import json
+import atexit
+import os
+import time
+
+import orjson
 from pathlib import Path
 from typing import Dict, List, Optional, Any
 from datetime import datetime
-from video_scraper.config import STATE_DIR
+from video_scraper.config import STATE_DIR, ensure_dirs
 from video_scraper.utils import logger
 
 
 class StateManager:
     def __init__(self, state_file: str = "scraper_state.json"):
+        ensure_dirs()
         self.state_file = STATE_DIR / state_file
         self.state = self._load_state()
+        self._build_indices()
+        self._dirty = False
+        self._last_save = 0.0
+        self._save_interval = 2.0
+        atexit.register(self._flush)
+
+    @staticmethod
+    def _task_key(task: Dict[str, Any]) -> bytes:
+        return orjson.dumps(task, option=orjson.OPT_SORT_KEYS)
+
+    def _build_indices(self):
+        # Set-based membership indices mirroring the state lists, so that
+        # add/remove checks are O(1) instead of scanning the whole list.
+        # The lists stay authoritative for serialization.
+        self._completed_keys = {self._task_key(t) for t in self.state.get("completed_tasks", [])}
+        self._pending_keys = {self._task_key(t) for t in self.state.get("pending_tasks", [])}
+        self._failed_keys = {self._task_key(t) for t in self.state.get("failed_tasks", [])}
+        self._completed_subtopic_keys = {
+            (x["topic"], x["subtopic"])
+            for x in self.state.get("completed_subtopics", [])
+        }
 
     def _load_state(self) -> Dict[str, Any]:
         if self.state_file.exists():
             try:
-                with open(self.state_file, "r", encoding="utf-8") as f:
-                    return json.load(f)
+                return orjson.loads(self.state_file.read_bytes())
             except Exception as e:
                 logger.error(f"Error loading state file: {e}")
                 return self._create_empty_state()
@@ -33,76 +58,102 @@ class StateManager:
             "metadata": {},
         }
 
-    def _save_state(self):
+    def _flush(self):
+        """Write the state file atomically (temp file + rename)."""
+        if not self._dirty:
+            return
         try:
             self.state["last_updated"] = datetime.now().isoformat()
-            with open(self.state_file, "w", encoding="utf-8") as f:
-                json.dump(self.state, f, indent=2, ensure_ascii=False)
+            tmp_file = self.state_file.with_suffix(".json.tmp")
+            tmp_file.write_bytes(
+                orjson.dumps(
+                    self.state,
+                    option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS,
+                )
+            )
+            os.replace(tmp_file, self.state_file)
+            self._dirty = False
+            self._last_save = time.monotonic()
         except Exception as e:
             logger.error(f"Error saving state file: {e}")
 
+    def _mark_dirty(self):
+        # Rewriting the whole state file on every mutation turns each
+        # completed task into a full-file serialize + write. Mark the
+        # state dirty and flush at most every _save_interval seconds;
+        # atexit (and an explicit flush()) cover the tail.
+        self._dirty = True
+        if time.monotonic() - self._last_save >= self._save_interval:
+            self._flush()
+
+    def flush(self):
+        """Force any buffered state changes to disk."""
+        self._flush()
+
     def is_paused(self) -> bool:
         return self.state.get("is_paused", False)
 
     def pause(self):
         self.state["is_paused"] = True
-        self._save_state()
+        self._mark_dirty()
         logger.info("Scraper paused")
 
     def resume(self):
         self.state["is_paused"] = False
-        self._save_state()
+        self._mark_dirty()
         logger.info("Scraper resumed")
 
     def set_current_task(self, task: Dict[str, Any]):
         self.state["current_task"] = task
-        self._save_state()
+        self._mark_dirty()
 
     def get_current_task(self) -> Optional[Dict[str, Any]]:
         return self.state.get("current_task")
 
     def add_completed_task(self, task: Dict[str, Any]):
-        if task not in self.state["completed_tasks"]:
+        key = self._task_key(task)
+        if key not in self._completed_keys:
+            self._completed_keys.add(key)
             self.state["completed_tasks"].append(task)
-            self._save_state()
+            self._mark_dirty()
 
     def add_completed_subtopic(self, topic: str, subtopic: str):
-        item = {"topic": topic, "subtopic": subtopic}
         if "completed_subtopics" not in self.state:
             self.state["completed_subtopics"] = []
-        
-        # Check if already exists
-        exists = any(
-            x["topic"] == topic and x["subtopic"] == subtopic 
-            for x in self.state["completed_subtopics"]
-        )
-        if not exists:
-            self.state["completed_subtopics"].append(item)
-            self._save_state()
+
+        if (topic, subtopic) not in self._completed_subtopic_keys:
+            self._completed_subtopic_keys.add((topic, subtopic))
+            self.state["completed_subtopics"].append({"topic": topic, "subtopic": subtopic})
+            self._mark_dirty()
+
+    def get_completed_subtopics(self) -> set:
+        """Return all completed (topic, subtopic) pairs as a set."""
+        return set(self._completed_subtopic_keys)
 
     def is_subtopic_completed(self, topic: str, subtopic: str) -> bool:
-        if "completed_subtopics" not in self.state:
-            return False
-        return any(
-            x["topic"] == topic and x["subtopic"] == subtopic 
-            for x in self.state["completed_subtopics"]
-        )
+        return (topic, subtopic) in self._completed_subtopic_keys
 
     def add_pending_task(self, task: Dict[str, Any]):
-        if task not in self.state["pending_tasks"]:
+        key = self._task_key(task)
+        if key not in self._pending_keys:
+            self._pending_keys.add(key)
             self.state["pending_tasks"].append(task)
-            self._save_state()
+            self._mark_dirty()
 
     def add_failed_task(self, task: Dict[str, Any], error: str):
         task_with_error = {**task, "error": error, "failed_at": datetime.now().isoformat()}
-        if task_with_error not in self.state["failed_tasks"]:
+        key = self._task_key(task_with_error)
+        if key not in self._failed_keys:
+            self._failed_keys.add(key)
             self.state["failed_tasks"].append(task_with_error)
-            self._save_state()
+            self._mark_dirty()
 
     def remove_pending_task(self, task: Dict[str, Any]):
-        if task in self.state["pending_tasks"]:
+        key = self._task_key(task)
+        if key in self._pending_keys:
+            self._pending_keys.discard(key)
             self.state["pending_tasks"].remove(task)
-            self._save_state()
+            self._mark_dirty()
 
     def get_pending_tasks(self) -> List[Dict[str, Any]]:
         return self.state.get("pending_tasks", [])
@@ -117,14 +168,15 @@ class StateManager:
         if "metadata" not in self.state:
             self.state["metadata"] = {}
         self.state["metadata"][key] = value
-        self._save_state()
+        self._mark_dirty()
 
     def get_metadata(self, key: str) -> Optional[Any]:
         return self.state.get("metadata", {}).get(key)
 
     def reset_state(self):
         self.state = self._create_empty_state()
-        self._save_state()
+        self._build_indices()
+        self._mark_dirty()
         logger.info("State reset")
 
     def get_progress_summary(self) -> Dict[str, Any]: